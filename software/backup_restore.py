@@ -4,19 +4,264 @@ Backup and Restore Utility
 Handles backup and restore operations for the cat feeder system
 """
 
+import io
 import os
+import gzip
 import json
+import time
+import zlib
+import errno
+import hashlib
 import shutil
+import signal
 import sqlite3
 import logging
 import zipfile
 import tarfile
+import tempfile
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, BinaryIO, List, Optional, Iterator, Tuple, Union
+
+try:
+    import zstandard
+except ImportError:
+    # Fall back to tar.gz backups
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# JSON encoding for the config and metadata archive members; orjson when
+# available. Both produce 2-space indented bytes.
+if orjson is not None:
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+    
+    _json_loads = json.loads
+
+# Archive formats this module can read, newest default first
+BACKUP_FORMATS = ("tar.zst", "tar.gz", "zip")
+TAR_SUFFIXES = (".zst", ".gz")
+
+# tarfile defaults to 10 KiB stream records and 16 KiB copy chunks; larger
+# buffers cut the per-chunk Python overhead and pipe writes
+TAR_BUFSIZE = 1024 * 1024
+
+# Directories never worth backing up; pruned before descending into them
+SKIP_DIRS = frozenset({"venv", ".venv", "__pycache__", ".git", ".mypy_cache"})
+
+# Only these software files are restored, not the entire directory
+SOFTWARE_FILES_TO_RESTORE = frozenset({"main.py", "requirements.txt", "test_system.py"})
+
+# SQLite journal files; only meaningful to a live connection
+SKIP_FILE_SUFFIXES = ("-wal", "-shm", "-journal")
+
+# Already-compressed formats that DEFLATE cannot shrink
+INCOMPRESSIBLE_SUFFIXES = frozenset({
+    ".gz", ".bz2", ".xz", ".zst", ".zip", ".png", ".jpg", ".mp4", ".db-wal", ".db-shm"
+})
+
+def _should_compress(name: str) -> bool:
+    """Check whether a file is worth running through DEFLATE"""
+    return os.path.splitext(name)[1].lower() not in INCOMPRESSIBLE_SUFFIXES
+
+def _stage_stream(src: BinaryIO, dst: Path) -> Path:
+    """
+    Write a file-like object (e.g. an archive member) beside dst
+    
+    The copy is written to dst with a .restore suffix and synced, so an
+    os.replace onto dst later swaps in complete contents.
+    
+    Args:
+        src: Source stream
+        dst: Final destination path
+        
+    Returns:
+        Path of the staged copy
+    """
+    staged_path = dst.with_name(dst.name + ".restore")
+    try:
+        with open(staged_path, 'wb') as f:
+            shutil.copyfileobj(src, f, length=8 * 1024 * 1024)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        staged_path.unlink(missing_ok=True)
+        raise
+    return staged_path
+
+def _iter_software_files(root: str = ".", arc_prefix: str = "software/") -> Iterator[Tuple[str, str]]:
+    """
+    Walk the software directory, skipping SKIP_DIRS without descending
+    and SQLite journal files
+    
+    Args:
+        root: Directory to walk
+        arc_prefix: Archive directory the files are placed under
+        
+    Yields:
+        Tuples of (path, archive name)
+    """
+    pending = deque([(root, arc_prefix)])
+    while pending:
+        directory, prefix = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name in SKIP_DIRS:
+                    continue
+                arcname = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, arcname + "/"))
+                elif entry.is_file() and not entry.name.endswith(SKIP_FILE_SUFFIXES):
+                    yield entry.path, arcname
+
+def _fast_copy(src: Union[str, Path], dst: Union[str, Path]):
+    """
+    Copy a file with its mode and timestamps, like shutil.copy2
+    
+    Uses os.sendfile so the data never passes through user space, falling
+    back to a large-buffer copyfileobj where sendfile is unsupported.
+    
+    Args:
+        src: Source file path
+        dst: Destination file path
+    """
+    with open(src, 'rb') as rf, open(dst, 'wb') as wf:
+        st = os.fstat(rf.fileno())
+        try:
+            offset = 0
+            while offset < st.st_size:
+                sent = os.sendfile(wf.fileno(), rf.fileno(), offset, st.st_size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except (AttributeError, OSError) as e:
+            if isinstance(e, OSError) and e.errno not in (errno.EINVAL, errno.ENOSYS):
+                raise
+            rf.seek(0)
+            wf.seek(0)
+            wf.truncate()
+            shutil.copyfileobj(rf, wf, length=8 * 1024 * 1024)
+        
+        os.fchmod(wf.fileno(), st.st_mode & 0o7777)
+    
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+def _bounded_map(executor: ThreadPoolExecutor, fn, items, window: int = 32) -> Iterator[Any]:
+    """
+    Like executor.map, but only keeps `window` calls in flight
+    
+    Results are yielded in input order, so the consumer can keep writing to a
+    single archive while the next files are read (and compressed) ahead.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def _read_file(item: Tuple[str, str]) -> Tuple[str, str, bytes]:
+    """Read a (path, arcname) pair from _iter_software_files into memory"""
+    path, arcname = item
+    with open(path, 'rb') as f:
+        return path, arcname, f.read()
+
+def _deflate_file(path: str, arcname: str, level: int = zlib.Z_DEFAULT_COMPRESSION) -> Tuple[zipfile.ZipInfo, bytes]:
+    """
+    Compress a file into a raw DEFLATE stream for a zip entry
+    
+    zlib releases the GIL, so several of these can run on a thread pool.
+    Files that are already compressed are stored as-is.
+    
+    Args:
+        path: File to compress
+        arcname: Name of the entry in the archive
+        level: DEFLATE compression level
+        
+    Returns:
+        Tuple of (zip entry info with CRC and sizes filled in, entry data)
+    """
+    zinfo = zipfile.ZipInfo.from_file(path, arcname)
+    compress = _should_compress(path)
+    zinfo.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    chunks = []
+    crc = 0
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            chunks.append(compressor.compress(chunk) if compress else chunk)
+    if compress:
+        chunks.append(compressor.flush())
+    data = b"".join(chunks)
+    
+    zinfo.CRC = crc
+    zinfo.file_size = size
+    zinfo.compress_size = len(data)
+    return zinfo, data
+
+# Private ZipFile members _write_precompressed uses. They have been there
+# since Python 3.6 (through 3.13); should a release drop any of them, zip
+# backups fall back to compressing on one thread through the public API.
+_ZIPFILE_INTERNALS = ('_lock', '_seekable', '_writecheck', '_didModify')
+
+def _can_write_precompressed(zipf: zipfile.ZipFile) -> bool:
+    """Check whether this Python's ZipFile has what _write_precompressed needs"""
+    return all(hasattr(zipf, name) for name in _ZIPFILE_INTERNALS)
+
+def _write_precompressed(zipf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, data: bytes):
+    """
+    Append an entry whose compressed data, CRC and sizes are already known
+    
+    zipfile has no public API for this, so it mirrors what
+    ZipFile.open(mode='w') does minus the compression step. Only call it
+    when _can_write_precompressed(zipf) is True.
+    """
+    # The members used here are private and absent from the type stubs
+    internals: Any = zipf
+    with internals._lock:
+        if internals._seekable:
+            internals.fp.seek(internals.start_dir)
+        zinfo.header_offset = internals.fp.tell()
+        internals._writecheck(zinfo)
+        internals._didModify = True
+        
+        internals.fp.write(zinfo.FileHeader())
+        internals.fp.write(data)
+        internals.start_dir = internals.fp.tell()
+        
+        internals.filelist.append(zinfo)
+        internals.NameToInfo[zinfo.filename] = zinfo
+
+def _tar_add_bytes(tar: tarfile.TarFile, arcname: str, payload: bytes):
+    """Add an in-memory file to a tar archive"""
+    info = tarfile.TarInfo(arcname)
+    info.size = len(payload)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(payload))
+
 class BackupManager:
     """Manages backup and restore operations"""
     
@@ -27,13 +272,108 @@ class BackupManager:
         Args:
             config: System configuration
         """
-        self.config = config
+        self.update_config(config)
         self.backup_dir = Path("/var/backups/cat-feeder")
         self.backup_dir.mkdir(parents=True, exist_ok=True)
         
         # Backup settings
         self.max_backups = 7
-        self.backup_format = "tar.gz"  # or "zip"
+        self.backup_format = "tar.zst" if zstandard is not None else "tar.gz"  # or "zip"
+        
+        # External parallel gzip compressor (None = use Python's gzip)
+        self.compressor = self._detect_compressor()
+        
+        # (backup_dir mtime_ns, [(name, path, size, mtime), ...]) from the
+        # last list_backups scan; cleared when a backup is created
+        self._backup_list: Optional[Tuple[int, List[Tuple[str, str, int, float]]]] = None
+    
+    def update_config(self, config: Dict[str, Any]):
+        """
+        Set the configuration and cache its serialized snapshot
+        
+        Args:
+            config: System configuration
+        """
+        self.config = config
+        
+        # gzip/DEFLATE level; 1 is several times faster than the default 6
+        # for only a few percent larger backups
+        self.compress_level = int(config.get('backup', {}).get('level', 1))
+        
+        self._config_json = _json_dumps(config)
+        self._config_sha256 = hashlib.sha256(self._config_json).hexdigest()
+    
+    def _detect_compressor(self) -> Optional[List[str]]:
+        """Find a parallel gzip implementation on PATH"""
+        pigz = shutil.which("pigz")
+        if pigz:
+            return [pigz, "-p", str(os.cpu_count() or 1)]
+        return None
+    
+    @contextmanager
+    def _open_tar(self, path: Path, mode: str) -> Iterator[tarfile.TarFile]:
+        """
+        Open a tar.zst or tar.gz archive for streaming read ('r') or write ('w')
+        
+        zstd compresses on all cores through zstandard. For gzip the work runs
+        in an external pigz process when available so compression uses every
+        core; otherwise Python's gzip is used. Either way the archive is
+        accessed as a non-seekable stream.
+        
+        Args:
+            path: Archive path
+            mode: 'r' or 'w'
+        """
+        if Path(path).suffix == '.zst':
+            if zstandard is None:
+                raise RuntimeError("zstandard is required for tar.zst backups")
+            
+            with open(path, f"{mode}b") as raw:
+                if mode == 'w':
+                    compressor = zstandard.ZstdCompressor(level=3, threads=-1, write_checksum=True)
+                    stream = compressor.stream_writer(raw, write_size=1024 * 1024, closefd=False)
+                else:
+                    decompressor = zstandard.ZstdDecompressor()
+                    stream = decompressor.stream_reader(raw, read_size=1024 * 1024, closefd=False)
+                with stream, tarfile.open(fileobj=stream, mode=f"{mode}|", bufsize=TAR_BUFSIZE,
+                                          copybufsize=TAR_BUFSIZE) as tar:
+                    yield tar
+            return
+        
+        if self.compressor is None:
+            with gzip.open(path, f"{mode}b", compresslevel=self.compress_level) as stream, \
+                    tarfile.open(fileobj=stream, mode=f"{mode}|", bufsize=TAR_BUFSIZE,
+                                 copybufsize=TAR_BUFSIZE) as tar:
+                yield tar
+            return
+        
+        writing = mode == 'w'
+        if writing:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+            cmd = self.compressor + [f"-{self.compress_level}"]
+            stdin, stdout = subprocess.PIPE, fd
+        else:
+            fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+            cmd = self.compressor + ["-d", "-c"]
+            stdin, stdout = fd, subprocess.PIPE
+        
+        try:
+            proc = subprocess.Popen(cmd, stdin=stdin, stdout=stdout, bufsize=8 * 1024 * 1024)
+        finally:
+            os.close(fd)
+        
+        pipe = proc.stdin if writing else proc.stdout
+        try:
+            with tarfile.open(fileobj=pipe, mode=f"{mode}|", bufsize=TAR_BUFSIZE,
+                              copybufsize=TAR_BUFSIZE) as tar:
+                yield tar
+        finally:
+            pipe.close()
+            returncode = proc.wait()
+        
+        # A reader that stops early closes the pipe under pigz, which is fine
+        if returncode != 0 and (writing or returncode != -signal.SIGPIPE):
+            raise RuntimeError(f"{cmd[0]} exited with status {returncode}")
     
     def create_backup(self, include_logs: bool = True, include_database: bool = True) -> str:
         """
@@ -50,14 +390,22 @@ class BackupManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_filename = f"cat-feeder-backup-{timestamp}.{self.backup_format}"
             backup_path = self.backup_dir / backup_filename
+            # Written under a hidden name that _scan_backups skips, then
+            # renamed, so a partial archive is never listed or restored
+            tmp_path = self.backup_dir / f".{backup_filename}"
             
             logger.info(f"Creating backup: {backup_filename}")
             
             # Create backup archive
-            if self.backup_format == "tar.gz":
-                self._create_tar_backup(backup_path, include_logs, include_database)
-            else:
-                self._create_zip_backup(backup_path, include_logs, include_database)
+            try:
+                if self.backup_format.startswith("tar"):
+                    self._create_tar_backup(tmp_path, include_logs, include_database)
+                else:
+                    self._create_zip_backup(tmp_path, include_logs, include_database)
+                os.replace(tmp_path, backup_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
             
             # Clean up old backups
             self._cleanup_old_backups()
@@ -68,15 +416,73 @@ class BackupManager:
         except Exception as e:
             logger.error(f"Failed to create backup: {e}")
             raise
+        
+        finally:
+            # The rename can land within the directory mtime's resolution of
+            # a listing taken while the archive was being written
+            self._backup_list = None
+    
+    def _metadata_payload(self, include_logs: bool, include_database: bool) -> bytes:
+        """Serialize the backup_metadata.json member"""
+        metadata = {
+            'timestamp': datetime.now().isoformat(),
+            'version': '1.1',
+            'includes': {
+                'logs': include_logs,
+                'database': include_database
+            },
+            'config_sha256': self._config_sha256
+        }
+        return _json_dumps(metadata)
+    
+    def _snapshot_db(self, db_path: str) -> Optional[Path]:
+        """
+        Take a consistent copy of a live SQLite database
+        
+        Uses SQLite's online backup API, so writes in progress cannot tear the
+        copy the way copying the file directly can.
+        
+        Args:
+            db_path: Path to the database file
+            
+        Returns:
+            Path to a temporary snapshot (caller removes it), or None if the
+            file is not an SQLite database
+        """
+        with open(db_path, 'rb') as f:
+            if f.read(16) != b"SQLite format 3\x00":
+                return None
+        
+        # Keep the short-lived snapshot on tmpfs where available so writing
+        # and unlinking it never touches the SD card
+        tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        fd, snapshot_path = tempfile.mkstemp(prefix="cat-feeder-db-", suffix=".db", dir=tmp_dir)
+        os.close(fd)
+        
+        src = sqlite3.connect(db_path)
+        dst = sqlite3.connect(snapshot_path)
+        try:
+            src.backup(dst, pages=1024, sleep=0)
+        finally:
+            dst.close()
+            src.close()
+        
+        return Path(snapshot_path)
     
     def _create_tar_backup(self, backup_path: Path, include_logs: bool, include_database: bool):
-        """Create tar.gz backup"""
-        with tarfile.open(backup_path, "w:gz") as tar:
-            # Add software directory (excluding venv)
-            software_dir = Path(".")
-            for item in software_dir.rglob("*"):
-                if item.is_file() and "venv" not in str(item):
-                    tar.add(item, arcname=f"software/{item.relative_to(software_dir)}")
+        """Create tar.zst or tar.gz backup"""
+        with self._open_tar(backup_path, 'w') as tar:
+            # Add metadata first so readers can stop after one member
+            _tar_add_bytes(tar, "backup_metadata.json", self._metadata_payload(include_logs, include_database))
+            _tar_add_bytes(tar, "config_snapshot.json", self._config_json)
+            
+            # Add software directory (excluding venv), reading files ahead
+            # while the current one is being written
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                for path, arcname, data in _bounded_map(executor, _read_file, _iter_software_files(".")):
+                    info = tar.gettarinfo(path, arcname=arcname)
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data))
             
             # Add configuration
             if Path("config.json").exists():
@@ -86,7 +492,12 @@ class BackupManager:
             if include_database:
                 db_path = self.config.get('database', {}).get('path', 'cat_feeder.db')
                 if Path(db_path).exists():
-                    tar.add(db_path, arcname=f"database/{Path(db_path).name}")
+                    snapshot = self._snapshot_db(db_path)
+                    try:
+                        tar.add(snapshot or db_path, arcname=f"database/{Path(db_path).name}")
+                    finally:
+                        if snapshot is not None:
+                            snapshot.unlink()
             
             # Add logs
             if include_logs:
@@ -94,34 +505,28 @@ class BackupManager:
                 if log_dir.exists():
                     for log_file in log_dir.glob("*.log"):
                         tar.add(log_file, arcname=f"logs/{log_file.name}")
-            
-            # Add metadata
-            metadata = {
-                'timestamp': datetime.now().isoformat(),
-                'version': '1.0',
-                'includes': {
-                    'logs': include_logs,
-                    'database': include_database
-                },
-                'config': self.config
-            }
-            
-            # Write metadata to temporary file
-            metadata_file = Path("backup_metadata.json")
-            with open(metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            
-            tar.add(metadata_file, arcname="backup_metadata.json")
-            metadata_file.unlink()  # Clean up temporary file
     
     def _create_zip_backup(self, backup_path: Path, include_logs: bool, include_database: bool):
         """Create zip backup"""
-        with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Add software directory (excluding venv)
-            software_dir = Path(".")
-            for item in software_dir.rglob("*"):
-                if item.is_file() and "venv" not in str(item):
-                    zipf.write(item, f"software/{item.relative_to(software_dir)}")
+        with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=self.compress_level) as zipf:
+            # Add metadata
+            zipf.writestr("backup_metadata.json", self._metadata_payload(include_logs, include_database))
+            zipf.writestr("config_snapshot.json", self._config_json)
+            
+            # Add software directory (excluding venv), compressing in parallel
+            if _can_write_precompressed(zipf):
+                with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                    entries = _bounded_map(
+                        executor,
+                        lambda item: _deflate_file(*item, level=self.compress_level),
+                        _iter_software_files(".")
+                    )
+                    for zinfo, data in entries:
+                        _write_precompressed(zipf, zinfo, data)
+            else:
+                for path, arcname in _iter_software_files("."):
+                    compress_type = zipfile.ZIP_DEFLATED if _should_compress(path) else zipfile.ZIP_STORED
+                    zipf.write(path, arcname, compress_type=compress_type)
             
             # Add configuration
             if Path("config.json").exists():
@@ -131,7 +536,12 @@ class BackupManager:
             if include_database:
                 db_path = self.config.get('database', {}).get('path', 'cat_feeder.db')
                 if Path(db_path).exists():
-                    zipf.write(db_path, f"database/{Path(db_path).name}")
+                    snapshot = self._snapshot_db(db_path)
+                    try:
+                        zipf.write(snapshot or db_path, f"database/{Path(db_path).name}")
+                    finally:
+                        if snapshot is not None:
+                            snapshot.unlink()
             
             # Add logs
             if include_logs:
@@ -139,25 +549,6 @@ class BackupManager:
                 if log_dir.exists():
                     for log_file in log_dir.glob("*.log"):
                         zipf.write(log_file, f"logs/{log_file.name}")
-            
-            # Add metadata
-            metadata = {
-                'timestamp': datetime.now().isoformat(),
-                'version': '1.0',
-                'includes': {
-                    'logs': include_logs,
-                    'database': include_database
-                },
-                'config': self.config
-            }
-            
-            # Write metadata to temporary file
-            metadata_file = Path("backup_metadata.json")
-            with open(metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            
-            zipf.write(metadata_file, "backup_metadata.json")
-            metadata_file.unlink()  # Clean up temporary file
     
     def restore_backup(self, backup_path: str, restore_database: bool = True, 
                       restore_config: bool = True, restore_logs: bool = False) -> bool:
@@ -180,136 +571,187 @@ class BackupManager:
             
             logger.info(f"Restoring from backup: {backup_path}")
             
-            # Extract backup
-            temp_dir = Path("/tmp/cat-feeder-restore")
-            temp_dir.mkdir(exist_ok=True)
-            
+            # Extract the selected members next to their destinations first,
+            # so a truncated or corrupt archive fails before anything live is
+            # overwritten; the staged files are then swapped in together
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            selected = (restore_config, restore_database, restore_logs)
+            staged: List[Tuple[str, str, Path]] = []
             try:
-                if backup_file.suffix == '.gz':
-                    with tarfile.open(backup_file, "r:gz") as tar:
-                        tar.extractall(temp_dir)
+                if backup_file.suffix in TAR_SUFFIXES:
+                    with self._open_tar(backup_file, 'r') as tar:
+                        for member in tar:
+                            if member.isfile():
+                                self._stage_member(member.name, tar.extractfile(member), staged, *selected)
                 else:
                     with zipfile.ZipFile(backup_file, 'r') as zipf:
-                        zipf.extractall(temp_dir)
-                
-                # Read metadata
-                metadata_file = temp_dir / "backup_metadata.json"
-                if metadata_file.exists():
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
-                    logger.info(f"Backup created: {metadata['timestamp']}")
-                
-                # Restore components
-                if restore_config and (temp_dir / "config.json").exists():
-                    self._restore_config(temp_dir / "config.json")
-                
-                if restore_database and (temp_dir / "database").exists():
-                    self._restore_database(temp_dir / "database")
-                
-                if restore_logs and (temp_dir / "logs").exists():
-                    self._restore_logs(temp_dir / "logs")
-                
-                # Restore software files (if needed)
-                if (temp_dir / "software").exists():
-                    self._restore_software(temp_dir / "software")
-                
-                logger.info("Backup restored successfully")
-                return True
+                        for info in zipf.infolist():
+                            if not info.is_dir():
+                                with zipf.open(info) as src:
+                                    self._stage_member(info.filename, src, staged, *selected)
                 
+                self._swap_in_staged(staged, timestamp)
+            
             finally:
-                # Clean up temporary directory
-                shutil.rmtree(temp_dir, ignore_errors=True)
+                # Left behind only if reading the archive or a swap failed
+                for _, _, staged_path in staged:
+                    staged_path.unlink(missing_ok=True)
+            
+            logger.info("Backup restored successfully")
+            return True
             
         except Exception as e:
             logger.error(f"Failed to restore backup: {e}")
             return False
     
-    def _restore_config(self, config_file: Path):
-        """Restore configuration file"""
+    def _stage_member(self, name: str, src: BinaryIO, staged: List[Tuple[str, str, Path]],
+                      restore_config: bool, restore_database: bool, restore_logs: bool):
+        """
+        Extract a single archive member beside its destination if its component was selected
+        
+        Args:
+            name: Archive member name
+            src: Member contents
+            staged: Receives (component, file name, staged path) for each extracted member
+        """
+        directory, _, file_name = name.rpartition('/')
+        
+        if name == "backup_metadata.json":
+            metadata = _json_loads(src.read())
+            logger.info(f"Backup created: {metadata['timestamp']}")
+        elif name == "config.json":
+            if restore_config:
+                staged.append(("config", file_name, _stage_stream(src, Path("config.json"))))
+        elif directory == "database" and file_name.endswith(".db"):
+            if restore_database:
+                staged.append(("database", file_name, _stage_stream(src, Path(file_name))))
+        elif directory == "logs" and file_name.endswith(".log"):
+            if restore_logs:
+                log_dir = Path("/var/log/cat-feeder")
+                log_dir.mkdir(exist_ok=True)
+                staged.append(("logs", file_name, _stage_stream(src, log_dir / file_name)))
+        elif directory == "software" and file_name in SOFTWARE_FILES_TO_RESTORE:
+            staged.append(("software", file_name, _stage_stream(src, Path(file_name))))
+    
+    def _swap_in_staged(self, staged: List[Tuple[str, str, Path]], timestamp: str):
+        """
+        Back up the current files and move the staged ones into their place
+        
+        Args:
+            staged: (component, file name, staged path) from _stage_member
+            timestamp: Suffix for the backups of the current files
+        """
+        # Backing up and replacing the software files is independent of the
+        # rest, so it overlaps the database snapshot
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pending = []
+            for component, file_name, staged_path in staged:
+                if component == "config":
+                    self._restore_config(staged_path, timestamp)
+                elif component == "database":
+                    self._restore_database(file_name, staged_path, timestamp)
+                elif component == "logs":
+                    self._restore_logs(file_name, staged_path)
+                else:
+                    pending.append(executor.submit(self._restore_software, file_name, staged_path, timestamp))
+            
+            # Surface any error from the background swaps
+            for future in pending:
+                future.result()
+    
+    def _restore_config(self, staged_path: Path, timestamp: str):
+        """Restore configuration file from its staged copy"""
         try:
             # Backup current config
             if Path("config.json").exists():
-                backup_name = f"config.json.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                shutil.copy2("config.json", backup_name)
+                backup_name = f"config.json.backup.{timestamp}"
+                _fast_copy("config.json", backup_name)
                 logger.info(f"Current config backed up as {backup_name}")
             
             # Restore config
-            shutil.copy2(config_file, "config.json")
+            os.replace(staged_path, "config.json")
             logger.info("Configuration restored")
             
         except Exception as e:
             logger.error(f"Failed to restore configuration: {e}")
             raise
     
-    def _restore_database(self, db_dir: Path):
-        """Restore database"""
+    def _restore_database(self, db_name: str, staged_path: Path, timestamp: str):
+        """
+        Restore database from its staged copy
+        
+        Nothing may have the database open meanwhile (CatFeeder.restore_backup
+        closes it first): the old -wal and -shm files are deleted, as SQLite
+        would otherwise replay the stale WAL on top of the restored file.
+        """
         try:
-            for db_file in db_dir.glob("*.db"):
-                # Backup current database
-                if Path(db_file.name).exists():
-                    backup_name = f"{db_file.name}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                    shutil.copy2(db_file.name, backup_name)
-                    logger.info(f"Current database backed up as {backup_name}")
-                
-                # Restore database
-                shutil.copy2(db_file, db_file.name)
-                logger.info(f"Database {db_file.name} restored")
+            db_path = Path(db_name)
+            
+            # Backup current database, including anything still in its WAL
+            if db_path.exists():
+                backup_name = f"{db_name}.backup.{timestamp}"
+                snapshot = self._snapshot_db(db_name)
+                if snapshot is not None:
+                    shutil.move(str(snapshot), backup_name)
+                else:
+                    _fast_copy(db_name, backup_name)
+                logger.info(f"Current database backed up as {backup_name}")
+            
+            for suffix in ("-wal", "-shm"):
+                try:
+                    os.remove(f"{db_name}{suffix}")
+                except FileNotFoundError:
+                    pass
+            os.replace(staged_path, db_path)
+            logger.info(f"Database {db_name} restored")
             
         except Exception as e:
             logger.error(f"Failed to restore database: {e}")
             raise
     
-    def _restore_logs(self, logs_dir: Path):
-        """Restore log files"""
+    def _restore_logs(self, log_name: str, staged_path: Path):
+        """Restore log file from its staged copy"""
         try:
-            log_dir = Path("/var/log/cat-feeder")
-            log_dir.mkdir(exist_ok=True)
-            
-            for log_file in logs_dir.glob("*.log"):
-                shutil.copy2(log_file, log_dir / log_file.name)
-                logger.info(f"Log file {log_file.name} restored")
+            os.replace(staged_path, staged_path.with_name(log_name))
+            logger.info(f"Log file {log_name} restored")
             
         except Exception as e:
             logger.error(f"Failed to restore logs: {e}")
             raise
     
-    def _restore_software(self, software_dir: Path):
-        """Restore software files"""
+    def _restore_software(self, file_name: str, staged_path: Path, timestamp: str):
+        """Restore software file from its staged copy"""
         try:
-            # Only restore specific files, not the entire directory
-            files_to_restore = [
-                "main.py",
-                "requirements.txt",
-                "test_system.py"
-            ]
-            
-            for file_name in files_to_restore:
-                source_file = software_dir / file_name
-                if source_file.exists():
-                    # Backup current file
-                    if Path(file_name).exists():
-                        backup_name = f"{file_name}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                        shutil.copy2(file_name, backup_name)
-                        logger.info(f"Current {file_name} backed up as {backup_name}")
-                    
-                    # Restore file
-                    shutil.copy2(source_file, file_name)
-                    logger.info(f"Software file {file_name} restored")
+            # Backup current file
+            if Path(file_name).exists():
+                backup_name = f"{file_name}.backup.{timestamp}"
+                _fast_copy(file_name, backup_name)
+                logger.info(f"Current {file_name} backed up as {backup_name}")
+            
+            # Restore file
+            os.replace(staged_path, file_name)
+            logger.info(f"Software file {file_name} restored")
             
         except Exception as e:
             logger.error(f"Failed to restore software files: {e}")
             raise
     
+    def _scan_backups(self) -> List[os.DirEntry]:
+        """Return backup file entries of any format, newest first, with their stat cached"""
+        suffixes = tuple(f".{fmt}" for fmt in BACKUP_FORMATS)
+        with os.scandir(self.backup_dir) as it:
+            entries = [e for e in it if e.name.endswith(suffixes) and not e.name.startswith(".")
+                       and e.is_file()]
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        return entries
+    
     def _cleanup_old_backups(self):
         """Remove old backups, keeping only the most recent ones"""
         try:
-            backup_files = list(self.backup_dir.glob(f"*.{self.backup_format}"))
-            backup_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-            
             # Remove old backups
-            for backup_file in backup_files[self.max_backups:]:
-                backup_file.unlink()
-                logger.info(f"Removed old backup: {backup_file.name}")
+            for entry in self._scan_backups()[self.max_backups:]:
+                os.unlink(entry.path)
+                logger.info(f"Removed old backup: {entry.name}")
             
         except Exception as e:
             logger.error(f"Failed to cleanup old backups: {e}")
@@ -317,20 +759,31 @@ class BackupManager:
     def list_backups(self) -> List[Dict[str, Any]]:
         """List available backups"""
         try:
+            # Only rescan the directory when files were added or removed
+            dir_mtime_ns = self.backup_dir.stat().st_mtime_ns
+            cached = self._backup_list
+            if cached is None or cached[0] != dir_mtime_ns:
+                rows = []
+                for entry in self._scan_backups():
+                    stat = entry.stat()
+                    rows.append((entry.name, entry.path, stat.st_size, stat.st_mtime))
+                cached = (dir_mtime_ns, rows)
+                self._backup_list = cached
+            
             backups = []
-            for backup_file in self.backup_dir.glob(f"*.{self.backup_format}"):
-                stat = backup_file.stat()
+            now = datetime.now()
+            # Already sorted by creation time (newest first)
+            for name, path, size, mtime in cached[1]:
+                created = datetime.fromtimestamp(mtime)
                 backup_info = {
-                    'filename': backup_file.name,
-                    'path': str(backup_file),
-                    'size_mb': stat.st_size / (1024 * 1024),
-                    'created': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    'age_days': (datetime.now() - datetime.fromtimestamp(stat.st_mtime)).days
+                    'filename': name,
+                    'path': path,
+                    'size_mb': size / (1024 * 1024),
+                    'created': created.isoformat(),
+                    'age_days': (now - created).days
                 }
                 backups.append(backup_info)
             
-            # Sort by creation time (newest first)
-            backups.sort(key=lambda x: x['created'], reverse=True)
             return backups
             
         except Exception as e:
@@ -344,36 +797,29 @@ class BackupManager:
             if not backup_file.exists():
                 return None
             
-            # Extract metadata
-            temp_dir = Path("/tmp/cat-feeder-info")
-            temp_dir.mkdir(exist_ok=True)
+            # Read metadata straight from the archive, without extracting
+            metadata = None
+            if backup_file.suffix in TAR_SUFFIXES:
+                with self._open_tar(backup_file, 'r') as tar:
+                    for member in tar:
+                        if member.name == "backup_metadata.json":
+                            metadata = _json_loads(tar.extractfile(member).read())
+                            break
+            else:
+                with zipfile.ZipFile(backup_file, 'r') as zipf:
+                    metadata = _json_loads(zipf.read("backup_metadata.json"))
             
-            try:
-                if backup_file.suffix == '.gz':
-                    with tarfile.open(backup_file, "r:gz") as tar:
-                        tar.extractall(temp_dir, members=[tar.getmember("backup_metadata.json")])
-                else:
-                    with zipfile.ZipFile(backup_file, 'r') as zipf:
-                        zipf.extract("backup_metadata.json", temp_dir)
-                
-                metadata_file = temp_dir / "backup_metadata.json"
-                if metadata_file.exists():
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
-                    
-                    stat = backup_file.stat()
-                    info = {
-                        'filename': backup_file.name,
-                        'path': str(backup_file),
-                        'size_mb': stat.st_size / (1024 * 1024),
-                        'created': metadata['timestamp'],
-                        'version': metadata['version'],
-                        'includes': metadata['includes']
-                    }
-                    return info
-                
-            finally:
-                shutil.rmtree(temp_dir, ignore_errors=True)
+            if metadata is not None:
+                stat = backup_file.stat()
+                info = {
+                    'filename': backup_file.name,
+                    'path': str(backup_file),
+                    'size_mb': stat.st_size / (1024 * 1024),
+                    'created': metadata['timestamp'],
+                    'version': metadata['version'],
+                    'includes': metadata['includes']
+                }
+                return info
             
             return None
             
@@ -390,41 +836,35 @@ class BackupManager:
             
             logger.info(f"Verifying backup: {backup_path}")
             
-            # Test archive integrity
-            if backup_file.suffix == '.gz':
-                with tarfile.open(backup_file, "r:gz") as tar:
-                    tar.getmembers()  # This will raise an error if corrupted
+            # Test archive integrity and collect member names in one pass
+            if backup_file.suffix in TAR_SUFFIXES:
+                with self._open_tar(backup_file, 'r') as tar:
+                    # Walking the headers raises an error if corrupted
+                    names = {member.name for member in tar}
+                    # Read past the end-of-archive marker so the decompressor
+                    # reaches the trailer and checks the CRC
+                    while tar.fileobj.read(1024 * 1024):
+                        pass
             else:
                 with zipfile.ZipFile(backup_file, 'r') as zipf:
-                    zipf.testzip()  # This will raise an error if corrupted
+                    names = set(zipf.namelist())
+                    bad_file = zipf.testzip()
+                if bad_file is not None:
+                    logger.error(f"Backup has corrupted member: {bad_file}")
+                    return False
             
-            # Check for required files
-            temp_dir = Path("/tmp/cat-feeder-verify")
-            temp_dir.mkdir(exist_ok=True)
+            # Check for metadata
+            if "backup_metadata.json" not in names:
+                logger.error("Backup missing metadata")
+                return False
             
-            try:
-                if backup_file.suffix == '.gz':
-                    with tarfile.open(backup_file, "r:gz") as tar:
-                        tar.extractall(temp_dir)
-                else:
-                    with zipfile.ZipFile(backup_file, 'r') as zipf:
-                        zipf.extractall(temp_dir)
-                
-                # Check for metadata
-                if not (temp_dir / "backup_metadata.json").exists():
-                    logger.error("Backup missing metadata")
-                    return False
-                
-                # Check for software files
-                if not (temp_dir / "software").exists():
-                    logger.error("Backup missing software files")
-                    return False
-                
-                logger.info("Backup verification successful")
-                return True
-                
-            finally:
-                shutil.rmtree(temp_dir, ignore_errors=True)
+            # Check for software files
+            if not any(name.startswith("software/") for name in names):
+                logger.error("Backup missing software files")
+                return False
+            
+            logger.info("Backup verification successful")
+            return True
             
         except Exception as e:
             logger.error(f"Backup verification failed: {e}")
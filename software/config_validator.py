@@ -4,19 +4,415 @@ Configuration Validator
 Validates configuration settings and provides safe defaults
 """
 
+import os
+import copy
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+try:
+    import fastjsonschema  # type: ignore[import-untyped]
+except ImportError:
+    fastjsonschema = None  # type: ignore[assignment]
+
+_json_loads: Callable[[bytes], Any]
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+_PIN = {'type': 'integer', 'minimum': 1, 'maximum': 40}
+_ANGLE = {'type': 'integer', 'minimum': 0, 'maximum': 180}
+_POSITIVE = {'type': 'number', 'exclusiveMinimum': 0}
+_NON_NEGATIVE = {'type': 'number', 'minimum': 0}
+_NON_EMPTY = {'type': 'string', 'minLength': 1}
+
+_VALID_LEVELS = frozenset(('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'))
+
+# HH:MM (or H:MM) on a 24 hour clock. This is the schema's fast path;
+# parse_schedule_time also accepts anything else int() reads in each part,
+# such as '8:5' or ' 8:00', as schedule times always have been
+_TIME_PATTERN = r'^(?:[01]?\d|2[0-3]):[0-5]\d$'
+
+# JSON Schema for a configuration that raises neither errors nor warnings.
+# Everything except the min/max cat weight ordering is expressed here.
+_SCHEMA: Dict[str, Any] = {
+    'type': 'object',
+    'required': ['weight_sensor', 'servo', 'weight_thresholds', 'web_interface',
+                 'database', 'logging', 'safety', 'maintenance'],
+    'properties': {
+        'weight_sensor': {
+            'type': 'object',
+            'required': ['dout_pin', 'sck_pin', 'calibration_factor', 'tare_samples', 'reading_samples'],
+            'properties': {
+                'dout_pin': _PIN,
+                'sck_pin': _PIN,
+                'calibration_factor': _POSITIVE,
+                'tare_samples': {'type': 'integer', 'minimum': 1, 'maximum': 50},
+                'reading_samples': {'type': 'integer', 'minimum': 1, 'maximum': 20}
+            }
+        },
+        'servo': {
+            'type': 'object',
+            'required': ['pin', 'min_angle', 'max_angle', 'feeding_angle', 'portion_grams_per_second',
+                         'min_dispense_time', 'max_dispense_time'],
+            'properties': {
+                'pin': _PIN,
+                'min_angle': _ANGLE,
+                'max_angle': _ANGLE,
+                'feeding_angle': _ANGLE,
+                'portion_grams_per_second': _POSITIVE,
+                'min_dispense_time': _NON_NEGATIVE,
+                'max_dispense_time': _POSITIVE
+            }
+        },
+        'feeding_schedules': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['time', 'portion', 'enabled'],
+                'properties': {
+                    'time': {'type': 'string', 'pattern': _TIME_PATTERN},
+                    'portion': {'type': 'number', 'exclusiveMinimum': 0, 'maximum': 200},
+                    'enabled': {'type': 'boolean'}
+                }
+            }
+        },
+        'weight_thresholds': {
+            'type': 'object',
+            'required': ['max_cat_weight'],
+            'properties': {
+                'min_cat_weight': _NON_NEGATIVE,
+                'max_cat_weight': _POSITIVE,
+                'tare_threshold': _NON_NEGATIVE
+            }
+        },
+        'web_interface': {
+            'type': 'object',
+            'required': ['host', 'port', 'secret_key'],
+            'properties': {
+                'host': _NON_EMPTY,
+                'port': {'type': 'integer', 'minimum': 1, 'maximum': 65535},
+                'secret_key': {'type': 'string', 'minLength': 16}
+            }
+        },
+        'database': {
+            'type': 'object',
+            'required': ['path', 'backup_interval_hours', 'cleanup_days'],
+            'properties': {
+                'path': _NON_EMPTY,
+                'backup_interval_hours': {'type': 'integer', 'minimum': 1},
+                'cleanup_days': {'type': 'integer', 'minimum': 1}
+            }
+        },
+        'logging': {
+            'type': 'object',
+            'required': ['level', 'file', 'max_size_mb'],
+            'properties': {
+                'level': {'enum': sorted(_VALID_LEVELS)},
+                'file': _NON_EMPTY,
+                'max_size_mb': _POSITIVE
+            }
+        },
+        'safety': {
+            'type': 'object',
+            'required': ['emergency_stop_pin', 'max_daily_feedings', 'max_portion_grams'],
+            'properties': {
+                'emergency_stop_pin': _PIN,
+                'max_daily_feedings': {'type': 'integer', 'minimum': 1, 'maximum': 50},
+                'min_feeding_interval_minutes': {'type': 'integer', 'minimum': 0},
+                'max_portion_grams': _POSITIVE
+            }
+        },
+        'notifications': {
+            'type': 'object',
+            'properties': {
+                'enabled': {'type': 'boolean'}
+            },
+            'if': {'required': ['enabled'], 'properties': {'enabled': {'const': True}}},
+            'then': {
+                'required': ['email'],
+                'properties': {
+                    'email': {
+                        'type': 'object',
+                        'required': ['smtp_server', 'username', 'password'],
+                        'properties': {
+                            'smtp_server': _NON_EMPTY,
+                            'username': _NON_EMPTY,
+                            'password': _NON_EMPTY
+                        }
+                    }
+                }
+            }
+        },
+        'maintenance': {
+            'type': 'object',
+            'required': ['health_check_interval_minutes'],
+            'properties': {
+                'auto_restart_hours': {'type': 'integer', 'minimum': 0},
+                'health_check_interval_minutes': {'type': 'integer', 'minimum': 1}
+            }
+        },
+        'real_time': {
+            'type': 'object',
+            'properties': {
+                'pinned_cpu': {'type': ['integer', 'null'], 'minimum': 0}
+            }
+        }
+    }
+}
+
+# Compiled once at import; None when fastjsonschema is not installed
+_VALIDATE = fastjsonschema.compile(_SCHEMA) if fastjsonschema is not None else None
+
+def _is_integer_spec(spec: Dict[str, Any]) -> bool:
+    """Check whether a schema property allows integers"""
+    types = spec.get('type')
+    return types == 'integer' or (isinstance(types, list) and 'integer' in types)
+
+# (section, field) of every integer property in _SCHEMA. JSON Schema counts
+# integral floats such as 5.0 as integers but the field rules don't, so a
+# float in any of these sends the config through the field rules.
+_INTEGER_FIELDS = tuple(
+    (section, field)
+    for section, section_spec in _SCHEMA['properties'].items()
+    for field, spec in section_spec.get('properties', {}).items()
+    if _is_integer_spec(spec)
+)
+
+# Defaults merged into every sanitized config. Values are deep-copied on
+# merge so callers never share (and mutate) these objects.
+_DEFAULTS = {
+    'weight_sensor': {
+        'dout_pin': 5,
+        'sck_pin': 6,
+        'calibration_factor': 2280.0,
+        'tare_samples': 10,
+        'reading_samples': 3,
+        'smoothing_samples': 10,
+        'stability_threshold': 0.05
+    },
+    'servo': {
+        'pin': 18,
+        'min_angle': 0,
+        'max_angle': 180,
+        'feeding_angle': 90,
+        'frequency': 50,
+        'portion_grams_per_second': 10,
+        'min_dispense_time': 0.5,
+        'max_dispense_time': 5.0
+    },
+    'feeding_schedules': [
+        {'time': '08:00', 'portion': 50, 'enabled': True, 'name': 'Breakfast'},
+        {'time': '12:00', 'portion': 50, 'enabled': True, 'name': 'Lunch'},
+        {'time': '18:00', 'portion': 50, 'enabled': True, 'name': 'Dinner'}
+    ],
+    'weight_thresholds': {
+        'min_cat_weight': 2.0,
+        'max_cat_weight': 8.0,
+        'tare_threshold': 0.1,
+        'cat_detection_delay': 2.0
+    },
+    'web_interface': {
+        'host': '0.0.0.0',
+        'port': 5000,
+        'debug': False,
+        'secret_key': 'change-this-secret-key-in-production',
+        'session_timeout': 3600
+    },
+    'database': {
+        'path': 'cat_feeder.db',
+        'backup_interval_hours': 24,
+        'cleanup_days': 30,
+        'max_log_size_mb': 100
+    },
+    'logging': {
+        'level': 'INFO',
+        'file': 'cat_feeder.log',
+        'max_size_mb': 10,
+        'backup_count': 5,
+        'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    },
+    'safety': {
+        'emergency_stop_pin': 27,
+        'max_daily_feedings': 10,
+        'min_feeding_interval_minutes': 120,
+        'max_portion_grams': 200,
+        'low_food_alert_threshold': 100
+    },
+    'notifications': {
+        'enabled': False,
+        'email': {
+            'smtp_server': 'smtp.gmail.com',
+            'smtp_port': 587,
+            'username': '',
+            'password': '',
+            'recipients': []
+        },
+        'webhook': {
+            'url': '',
+            'enabled': False
+        }
+    },
+    'maintenance': {
+        'auto_restart_hours': 168,
+        'health_check_interval_minutes': 30,
+        'calibration_reminder_days': 30
+    }
+}
+
+# Scalar field rules: (section, field, kind, lo, hi, default, severity, message).
+# kind is 'pin' (GPIO 1-40), 'angle' (0-180), 'int', 'optional_int' (int or
+# null), 'number', 'positive' (number > 0) or 'str' (lo = min length); bounds
+# are inclusive and None means unbounded. default is used for a missing
+# field, None makes a missing field fail.
+_FIELD_RULES = (
+    ('weight_sensor', 'dout_pin', 'pin', None, None, None, 'error', "Invalid dout_pin: must be integer 1-40"),
+    ('weight_sensor', 'sck_pin', 'pin', None, None, None, 'error', "Invalid sck_pin: must be integer 1-40"),
+    ('weight_sensor', 'calibration_factor', 'positive', None, None, None, 'error', "Invalid calibration_factor: must be positive number"),
+    ('weight_sensor', 'tare_samples', 'int', 1, 50, None, 'warning', "tare_samples should be 1-50, using default"),
+    ('weight_sensor', 'reading_samples', 'int', 1, 20, None, 'warning', "reading_samples should be 1-20, using default"),
+    ('servo', 'pin', 'pin', None, None, None, 'error', "Invalid servo pin: must be integer 1-40"),
+    ('servo', 'min_angle', 'angle', None, None, None, 'error', "Invalid min_angle: must be 0-180"),
+    ('servo', 'max_angle', 'angle', None, None, None, 'error', "Invalid max_angle: must be 0-180"),
+    ('servo', 'feeding_angle', 'angle', None, None, None, 'error', "Invalid feeding_angle: must be 0-180"),
+    ('servo', 'portion_grams_per_second', 'positive', None, None, None, 'error', "Invalid portion_grams_per_second: must be positive"),
+    ('servo', 'min_dispense_time', 'number', 0, None, None, 'error', "Invalid min_dispense_time: must be non-negative"),
+    ('servo', 'max_dispense_time', 'positive', None, None, None, 'error', "Invalid max_dispense_time: must be positive"),
+    ('weight_thresholds', 'min_cat_weight', 'number', 0, None, 0, 'error', "Invalid min_cat_weight: must be non-negative"),
+    ('weight_thresholds', 'max_cat_weight', 'positive', None, None, None, 'error', "Invalid max_cat_weight: must be positive"),
+    ('weight_thresholds', 'tare_threshold', 'number', 0, None, 0, 'error', "Invalid tare_threshold: must be non-negative"),
+    ('web_interface', 'host', 'str', 1, None, None, 'error', "Invalid web interface host"),
+    ('web_interface', 'port', 'int', 1, 65535, None, 'error', "Invalid web interface port: must be 1-65535"),
+    ('web_interface', 'secret_key', 'str', 16, None, None, 'warning', "Secret key should be at least 16 characters long"),
+    ('database', 'path', 'str', 1, None, None, 'error', "Invalid database path"),
+    ('database', 'backup_interval_hours', 'int', 1, None, None, 'warning', "backup_interval_hours should be at least 1"),
+    ('database', 'cleanup_days', 'int', 1, None, None, 'warning', "cleanup_days should be at least 1"),
+    ('logging', 'file', 'str', 1, None, None, 'error', "Invalid log file path"),
+    ('logging', 'max_size_mb', 'positive', None, None, None, 'warning', "max_size_mb should be positive"),
+    ('safety', 'emergency_stop_pin', 'pin', None, None, None, 'error', "Invalid emergency_stop_pin: must be integer 1-40"),
+    ('safety', 'max_daily_feedings', 'int', 1, 50, None, 'warning', "max_daily_feedings should be 1-50"),
+    ('safety', 'min_feeding_interval_minutes', 'int', 0, None, 0, 'warning', "min_feeding_interval_minutes should be non-negative"),
+    ('safety', 'max_portion_grams', 'positive', None, None, None, 'warning', "max_portion_grams should be positive"),
+    ('maintenance', 'auto_restart_hours', 'int', 0, None, 0, 'warning', "auto_restart_hours should be non-negative"),
+    ('maintenance', 'health_check_interval_minutes', 'int', 1, None, None, 'warning', "health_check_interval_minutes should be at least 1"),
+    ('real_time', 'pinned_cpu', 'optional_int', 0, None, None, 'warning', "pinned_cpu should be a non-negative integer or null, running unpinned"),
+)
+
+# _FIELD_RULES grouped by section, so each section dict is fetched once
+_RULES_BY_SECTION: Dict[str, List[tuple]] = {}
+for _rule in _FIELD_RULES:
+    _RULES_BY_SECTION.setdefault(_rule[0], []).append(_rule[1:])
+del _rule
+
+# Message templates for checks outside _FIELD_RULES
+_MESSAGES = {
+    'schedules_type': "feeding_schedules must be a list",
+    'schedule_type': "Schedule {} must be a dictionary",
+    'invalid_time': "Invalid time format in schedule {}: {}",
+    'invalid_portion': "Invalid portion in schedule {}: must be 1-200g",
+    'enabled_type': "Schedule {} enabled flag should be boolean",
+    'weight_order': "min_cat_weight must be less than max_cat_weight",
+    'invalid_level': "Invalid log level: {}. Must be one of " + str(sorted(_VALID_LEVELS)),
+    'smtp_server': "SMTP server required for email notifications",
+    'email_credentials': "Email credentials required for notifications"
+}
+
+def parse_schedule_time(time_str: Any) -> Optional[int]:
+    """
+    Parse a schedule's H:M time
+    
+    Args:
+        time_str: Time from a feeding schedule
+        
+    Returns:
+        Minutes since midnight, or None if time_str is not a valid time
+    """
+    if not isinstance(time_str, str):
+        return None
+    
+    parts = time_str.split(':')
+    if len(parts) != 2:
+        return None
+    
+    try:
+        hour = int(parts[0])
+        minute = int(parts[1])
+    except ValueError:
+        return None
+    
+    if 0 <= hour <= 23 and 0 <= minute <= 59:
+        return hour * 60 + minute
+    return None
+
+def _valid_pin(value: Any) -> bool:
+    """Check for a GPIO pin number 1-40 (bools are not pins)"""
+    return type(value) is int and 1 <= value <= 40
+
+def _valid_angle(value: Any) -> bool:
+    """Check for a servo angle 0-180 (bools are not angles)"""
+    return type(value) is int and 0 <= value <= 180
+
+def _in_range(value: Any, kind: str, lo: Any, hi: Any) -> bool:
+    """Check a value against one _FIELD_RULES entry"""
+    if kind == 'pin':
+        return _valid_pin(value)
+    
+    if kind == 'angle':
+        return _valid_angle(value)
+    
+    if kind == 'str':
+        return isinstance(value, str) and len(value) >= lo
+    
+    if kind == 'optional_int':
+        return value is None or (type(value) is int and value >= lo)
+    
+    if not isinstance(value, int if kind == 'int' else (int, float)):
+        return False
+    
+    if kind == 'positive' and value <= 0:
+        return False
+    
+    return (lo is None or value >= lo) and (hi is None or value <= hi)
+
+def _matches_schema(config: Dict[str, Any]) -> bool:
+    """Return True if the compiled schema accepts the configuration"""
+    if _VALIDATE is None:
+        return False
+    
+    try:
+        _VALIDATE(config)
+    except fastjsonschema.JsonSchemaException:
+        return False
+    
+    for section, field in _INTEGER_FIELDS:
+        if type(config.get(section, {}).get(field)) is float:
+            return False
+    return True
+
 class ConfigValidator:
     """Validates and sanitizes configuration settings"""
     
-    def __init__(self):
-        self.errors = []
-        self.warnings = []
+    def __init__(self) -> None:
+        # (template, args) records, formatted only when read
+        self._errors: List[Tuple[str, tuple]] = []
+        self._warnings: List[Tuple[str, tuple]] = []
+        self._failed = False
+    
+    @property
+    def errors(self) -> List[str]:
+        """Error messages from the last validation"""
+        return [template.format(*args) for template, args in self._errors]
+    
+    @property
+    def warnings(self) -> List[str]:
+        """Warning messages from the last validation"""
+        return [template.format(*args) for template, args in self._warnings]
     
     def validate_config(self, config: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
         """
@@ -28,341 +424,182 @@ class ConfigValidator:
         Returns:
             Tuple of (is_valid, sanitized_config)
         """
-        self.errors = []
-        self.warnings = []
-        
-        # Validate each section
-        self._validate_weight_sensor(config.get('weight_sensor', {}))
-        self._validate_servo(config.get('servo', {}))
-        self._validate_feeding_schedules(config.get('feeding_schedules', []))
-        self._validate_weight_thresholds(config.get('weight_thresholds', {}))
-        self._validate_web_interface(config.get('web_interface', {}))
-        self._validate_database(config.get('database', {}))
-        self._validate_logging(config.get('logging', {}))
-        self._validate_safety(config.get('safety', {}))
-        self._validate_notifications(config.get('notifications', {}))
-        self._validate_maintenance(config.get('maintenance', {}))
+        is_valid = self._check(config, collect_errors=True)
         
         # Create sanitized config with defaults
         sanitized_config = self._create_sanitized_config(config)
         
         # Log validation results
-        if self.errors:
+        if self._errors:
             for error in self.errors:
                 logger.error(f"Config validation error: {error}")
         
-        if self.warnings:
+        if self._warnings:
             for warning in self.warnings:
                 logger.warning(f"Config validation warning: {warning}")
         
-        return len(self.errors) == 0, sanitized_config
+        return is_valid, sanitized_config
     
-    def _validate_weight_sensor(self, config: Dict[str, Any]):
-        """Validate weight sensor configuration"""
-        # GPIO pins
-        if not isinstance(config.get('dout_pin'), int) or config['dout_pin'] < 1 or config['dout_pin'] > 40:
-            self.errors.append("Invalid dout_pin: must be integer 1-40")
-        
-        if not isinstance(config.get('sck_pin'), int) or config['sck_pin'] < 1 or config['sck_pin'] > 40:
-            self.errors.append("Invalid sck_pin: must be integer 1-40")
-        
-        # Calibration factor
-        if not isinstance(config.get('calibration_factor'), (int, float)) or config['calibration_factor'] <= 0:
-            self.errors.append("Invalid calibration_factor: must be positive number")
+    def is_valid(self, config: Dict[str, Any]) -> bool:
+        """
+        Check whether a configuration is valid without building messages
         
-        # Sample counts
-        if not isinstance(config.get('tare_samples'), int) or config['tare_samples'] < 1 or config['tare_samples'] > 50:
-            self.warnings.append("tare_samples should be 1-50, using default")
+        Stops at the first error, skips warnings, and neither logs nor
+        sanitizes. Use validate_config to find out what is wrong.
         
-        if not isinstance(config.get('reading_samples'), int) or config['reading_samples'] < 1 or config['reading_samples'] > 20:
-            self.warnings.append("reading_samples should be 1-20, using default")
+        Args:
+            config: Configuration dictionary
+            
+        Returns:
+            True if configuration has no errors
+        """
+        return self._check(config, collect_errors=False)
     
-    def _validate_servo(self, config: Dict[str, Any]):
-        """Validate servo configuration"""
-        # GPIO pin
-        if not isinstance(config.get('pin'), int) or config['pin'] < 1 or config['pin'] > 40:
-            self.errors.append("Invalid servo pin: must be integer 1-40")
-        
-        # Angles
-        if not isinstance(config.get('min_angle'), int) or config['min_angle'] < 0 or config['min_angle'] > 180:
-            self.errors.append("Invalid min_angle: must be 0-180")
-        
-        if not isinstance(config.get('max_angle'), int) or config['max_angle'] < 0 or config['max_angle'] > 180:
-            self.errors.append("Invalid max_angle: must be 0-180")
-        
-        if not isinstance(config.get('feeding_angle'), int) or config['feeding_angle'] < 0 or config['feeding_angle'] > 180:
-            self.errors.append("Invalid feeding_angle: must be 0-180")
-        
-        # Dispensing parameters
-        if not isinstance(config.get('portion_grams_per_second'), (int, float)) or config['portion_grams_per_second'] <= 0:
-            self.errors.append("Invalid portion_grams_per_second: must be positive")
-        
-        if not isinstance(config.get('min_dispense_time'), (int, float)) or config['min_dispense_time'] < 0:
-            self.errors.append("Invalid min_dispense_time: must be non-negative")
-        
-        if not isinstance(config.get('max_dispense_time'), (int, float)) or config['max_dispense_time'] <= 0:
-            self.errors.append("Invalid max_dispense_time: must be positive")
+    def _check(self, config: Dict[str, Any], collect_errors: bool) -> bool:
+        """Run all checks, returning True if no errors were found"""
+        self._errors = []
+        self._warnings = []
+        self._failed = False
+        
+        if _matches_schema(config):
+            # The schema cannot compare min/max cat weight, check that here
+            self._validate_weight_thresholds(config.get('weight_thresholds', {}), collect_errors)
+        else:
+            # Validate each section to collect every error and warning
+            checks: Tuple[Tuple[Callable[[Any, bool], None], Any], ...] = (
+                (self._validate_fields, config),
+                (self._validate_feeding_schedules, config.get('feeding_schedules', [])),
+                (self._validate_weight_thresholds, config.get('weight_thresholds', {})),
+                (self._validate_logging, config.get('logging', {})),
+                (self._validate_notifications, config.get('notifications', {}))
+            )
+            for check, section in checks:
+                check(section, collect_errors)
+                if self._failed:
+                    break
+        
+        return not self._failed and len(self._errors) == 0
     
-    def _validate_feeding_schedules(self, schedules: List[Dict[str, Any]]):
+    def _validate_fields(self, config: Dict[str, Any], collect_errors: bool = True):
+        """Validate scalar fields of every section against _FIELD_RULES"""
+        for section, rules in _RULES_BY_SECTION.items():
+            values = config.get(section, {})
+            for field, kind, lo, hi, default, severity, message in rules:
+                if not collect_errors and severity != 'error':
+                    continue
+                
+                if not _in_range(values.get(field, default), kind, lo, hi):
+                    if not collect_errors:
+                        self._failed = True
+                        return
+                    (self._errors if severity == 'error' else self._warnings).append((message, ()))
+    
+    def _validate_feeding_schedules(self, schedules: List[Dict[str, Any]], collect_errors: bool = True):
         """Validate feeding schedules"""
         if not isinstance(schedules, list):
-            self.errors.append("feeding_schedules must be a list")
+            self._failed = not collect_errors
+            if collect_errors:
+                self._errors.append((_MESSAGES['schedules_type'], ()))
             return
         
+        errors = self._errors
+        warnings = self._warnings
+        
         for i, schedule in enumerate(schedules):
             if not isinstance(schedule, dict):
-                self.errors.append(f"Schedule {i} must be a dictionary")
+                if not collect_errors:
+                    self._failed = True
+                    return
+                errors.append((_MESSAGES['schedule_type'], (i,)))
                 continue
             
-            # Time format
+            # Each field is looked up once, then checked inline
             time_str = schedule.get('time', '')
-            if not self._is_valid_time_format(time_str):
-                self.errors.append(f"Invalid time format in schedule {i}: {time_str}")
+            portion = schedule.get('portion', 0)
+            
+            # Time format
+            if parse_schedule_time(time_str) is None:
+                if not collect_errors:
+                    self._failed = True
+                    return
+                errors.append((_MESSAGES['invalid_time'], (i, time_str)))
             
             # Portion size
-            portion = schedule.get('portion', 0)
             if not isinstance(portion, (int, float)) or portion <= 0 or portion > 200:
-                self.errors.append(f"Invalid portion in schedule {i}: must be 1-200g")
+                if not collect_errors:
+                    self._failed = True
+                    return
+                errors.append((_MESSAGES['invalid_portion'], (i,)))
             
             # Enabled flag
-            if not isinstance(schedule.get('enabled'), bool):
-                self.warnings.append(f"Schedule {i} enabled flag should be boolean")
+            if collect_errors and not isinstance(schedule.get('enabled'), bool):
+                warnings.append((_MESSAGES['enabled_type'], (i,)))
     
-    def _validate_weight_thresholds(self, config: Dict[str, Any]):
-        """Validate weight thresholds"""
-        # Cat weight range
+    def _validate_weight_thresholds(self, config: Dict[str, Any], collect_errors: bool = True):
+        """Validate that the cat weight range is ordered"""
         min_weight = config.get('min_cat_weight', 0)
         max_weight = config.get('max_cat_weight', 0)
         
-        if not isinstance(min_weight, (int, float)) or min_weight < 0:
-            self.errors.append("Invalid min_cat_weight: must be non-negative")
-        
-        if not isinstance(max_weight, (int, float)) or max_weight <= 0:
-            self.errors.append("Invalid max_cat_weight: must be positive")
-        
         if min_weight >= max_weight:
-            self.errors.append("min_cat_weight must be less than max_cat_weight")
-        
-        # Tare threshold
-        tare_threshold = config.get('tare_threshold', 0)
-        if not isinstance(tare_threshold, (int, float)) or tare_threshold < 0:
-            self.errors.append("Invalid tare_threshold: must be non-negative")
+            self._failed = not collect_errors
+            if collect_errors:
+                self._errors.append((_MESSAGES['weight_order'], ()))
     
-    def _validate_web_interface(self, config: Dict[str, Any]):
-        """Validate web interface configuration"""
-        # Host
-        host = config.get('host', '')
-        if not isinstance(host, str) or not host:
-            self.errors.append("Invalid web interface host")
-        
-        # Port
-        port = config.get('port', 0)
-        if not isinstance(port, int) or port < 1 or port > 65535:
-            self.errors.append("Invalid web interface port: must be 1-65535")
-        
-        # Secret key
-        secret_key = config.get('secret_key', '')
-        if not isinstance(secret_key, str) or len(secret_key) < 16:
-            self.warnings.append("Secret key should be at least 16 characters long")
-    
-    def _validate_database(self, config: Dict[str, Any]):
-        """Validate database configuration"""
-        # Path
-        path = config.get('path', '')
-        if not isinstance(path, str) or not path:
-            self.errors.append("Invalid database path")
-        
-        # Backup interval
-        backup_interval = config.get('backup_interval_hours', 0)
-        if not isinstance(backup_interval, int) or backup_interval < 1:
-            self.warnings.append("backup_interval_hours should be at least 1")
-        
-        # Cleanup days
-        cleanup_days = config.get('cleanup_days', 0)
-        if not isinstance(cleanup_days, int) or cleanup_days < 1:
-            self.warnings.append("cleanup_days should be at least 1")
-    
-    def _validate_logging(self, config: Dict[str, Any]):
-        """Validate logging configuration"""
-        # Level
+    def _validate_logging(self, config: Dict[str, Any], collect_errors: bool = True):
+        """Validate logging level"""
         level = config.get('level', '')
-        valid_levels = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
-        if level not in valid_levels:
-            self.errors.append(f"Invalid log level: {level}. Must be one of {valid_levels}")
-        
-        # File
-        log_file = config.get('file', '')
-        if not isinstance(log_file, str) or not log_file:
-            self.errors.append("Invalid log file path")
-        
-        # Max size
-        max_size = config.get('max_size_mb', 0)
-        if not isinstance(max_size, (int, float)) or max_size <= 0:
-            self.warnings.append("max_size_mb should be positive")
+        if not isinstance(level, str) or level not in _VALID_LEVELS:
+            self._failed = not collect_errors
+            if collect_errors:
+                self._errors.append((_MESSAGES['invalid_level'], (level,)))
     
-    def _validate_safety(self, config: Dict[str, Any]):
-        """Validate safety configuration"""
-        # Emergency stop pin
-        emergency_pin = config.get('emergency_stop_pin', 0)
-        if not isinstance(emergency_pin, int) or emergency_pin < 1 or emergency_pin > 40:
-            self.errors.append("Invalid emergency_stop_pin: must be integer 1-40")
-        
-        # Daily feeding limit
-        max_daily = config.get('max_daily_feedings', 0)
-        if not isinstance(max_daily, int) or max_daily < 1 or max_daily > 50:
-            self.warnings.append("max_daily_feedings should be 1-50")
-        
-        # Feeding interval
-        min_interval = config.get('min_feeding_interval_minutes', 0)
-        if not isinstance(min_interval, int) or min_interval < 0:
-            self.warnings.append("min_feeding_interval_minutes should be non-negative")
-        
-        # Max portion
-        max_portion = config.get('max_portion_grams', 0)
-        if not isinstance(max_portion, (int, float)) or max_portion <= 0:
-            self.warnings.append("max_portion_grams should be positive")
-    
-    def _validate_notifications(self, config: Dict[str, Any]):
+    def _validate_notifications(self, config: Dict[str, Any], collect_errors: bool = True):
         """Validate notification configuration"""
+        # Only warnings here, nothing to do for a validity check
+        if not collect_errors:
+            return
+        
         # Email settings
         email_config = config.get('email', {})
         if config.get('enabled', False):
             if not email_config.get('smtp_server'):
-                self.warnings.append("SMTP server required for email notifications")
+                self._warnings.append((_MESSAGES['smtp_server'], ()))
             
             if not email_config.get('username') or not email_config.get('password'):
-                self.warnings.append("Email credentials required for notifications")
-    
-    def _validate_maintenance(self, config: Dict[str, Any]):
-        """Validate maintenance configuration"""
-        # Auto restart
-        auto_restart = config.get('auto_restart_hours', 0)
-        if not isinstance(auto_restart, int) or auto_restart < 0:
-            self.warnings.append("auto_restart_hours should be non-negative")
-        
-        # Health check interval
-        health_check = config.get('health_check_interval_minutes', 0)
-        if not isinstance(health_check, int) or health_check < 1:
-            self.warnings.append("health_check_interval_minutes should be at least 1")
+                self._warnings.append((_MESSAGES['email_credentials'], ()))
     
     def _is_valid_time_format(self, time_str: str) -> bool:
         """Check if time string is in HH:MM format"""
-        try:
-            if not isinstance(time_str, str):
-                return False
-            
-            parts = time_str.split(':')
-            if len(parts) != 2:
-                return False
-            
-            hour = int(parts[0])
-            minute = int(parts[1])
-            
-            return 0 <= hour <= 23 and 0 <= minute <= 59
-        except (ValueError, TypeError):
-            return False
+        return parse_schedule_time(time_str) is not None
     
     def _create_sanitized_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Create sanitized configuration with defaults"""
-        sanitized = config.copy()
-        
-        # Add missing sections with defaults
-        defaults = {
-            'weight_sensor': {
-                'dout_pin': 5,
-                'sck_pin': 6,
-                'calibration_factor': 2280.0,
-                'tare_samples': 10,
-                'reading_samples': 3,
-                'smoothing_samples': 10,
-                'stability_threshold': 0.05
-            },
-            'servo': {
-                'pin': 18,
-                'min_angle': 0,
-                'max_angle': 180,
-                'feeding_angle': 90,
-                'frequency': 50,
-                'portion_grams_per_second': 10,
-                'min_dispense_time': 0.5,
-                'max_dispense_time': 5.0
-            },
-            'feeding_schedules': [
-                {'time': '08:00', 'portion': 50, 'enabled': True, 'name': 'Breakfast'},
-                {'time': '12:00', 'portion': 50, 'enabled': True, 'name': 'Lunch'},
-                {'time': '18:00', 'portion': 50, 'enabled': True, 'name': 'Dinner'}
-            ],
-            'weight_thresholds': {
-                'min_cat_weight': 2.0,
-                'max_cat_weight': 8.0,
-                'tare_threshold': 0.1,
-                'cat_detection_delay': 2.0
-            },
-            'web_interface': {
-                'host': '0.0.0.0',
-                'port': 5000,
-                'debug': False,
-                'secret_key': 'change-this-secret-key-in-production',
-                'session_timeout': 3600
-            },
-            'database': {
-                'path': 'cat_feeder.db',
-                'backup_interval_hours': 24,
-                'cleanup_days': 30,
-                'max_log_size_mb': 100
-            },
-            'logging': {
-                'level': 'INFO',
-                'file': 'cat_feeder.log',
-                'max_size_mb': 10,
-                'backup_count': 5,
-                'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            },
-            'safety': {
-                'emergency_stop_pin': 27,
-                'max_daily_feedings': 10,
-                'min_feeding_interval_minutes': 120,
-                'max_portion_grams': 200,
-                'low_food_alert_threshold': 100
-            },
-            'notifications': {
-                'enabled': False,
-                'email': {
-                    'smtp_server': 'smtp.gmail.com',
-                    'smtp_port': 587,
-                    'username': '',
-                    'password': '',
-                    'recipients': []
-                },
-                'webhook': {
-                    'url': '',
-                    'enabled': False
-                }
-            },
-            'maintenance': {
-                'auto_restart_hours': 168,
-                'health_check_interval_minutes': 30,
-                'calibration_reminder_days': 30
-            }
-        }
-        
-        # Merge defaults with provided config
-        for section, default_values in defaults.items():
+        # Provided sections override the defaults, missing ones are copied in
+        sanitized = {**config}
+        for section, default_values in _DEFAULTS.items():
             if section not in sanitized:
-                sanitized[section] = default_values
-            else:
-                # Merge nested dictionaries
-                if isinstance(default_values, dict):
-                    for key, default_value in default_values.items():
-                        if key not in sanitized[section]:
-                            sanitized[section][key] = default_value
+                sanitized[section] = copy.deepcopy(default_values)
+            elif isinstance(default_values, dict) and isinstance(sanitized[section], dict):
+                # Merge nested dictionaries without touching the caller's copy
+                provided = sanitized[section]
+                merged = {**default_values, **provided}
+                for key in default_values.keys() - provided.keys():
+                    if isinstance(merged[key], (dict, list)):
+                        merged[key] = copy.deepcopy(merged[key])
+                sanitized[section] = merged
         
         return sanitized
 
+# Results of validate_config_file keyed by (path, mtime_ns, size)
+_FILE_CACHE: Dict[Tuple[str, int, int], Tuple[bool, Dict[str, Any]]] = {}
+_FILE_CACHE_SIZE = 4
+
 def validate_config_file(config_path: str) -> Tuple[bool, Dict[str, Any]]:
     """
     Validate configuration file
     
+    Results are cached until the file's mtime or size changes.
+    
     Args:
         config_path: Path to configuration file
         
@@ -370,11 +607,25 @@ def validate_config_file(config_path: str) -> Tuple[bool, Dict[str, Any]]:
         Tuple of (is_valid, config_dict)
     """
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        st = os.stat(config_path)
+        key = (str(config_path), st.st_mtime_ns, st.st_size)
+        
+        cached = _FILE_CACHE.get(key)
+        if cached is None:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
+            with open(config_path, 'rb') as f:
+                config = _json_loads(f.read())
+            
+            validator = ConfigValidator()
+            cached = validator.validate_config(config)
+            
+            if len(_FILE_CACHE) >= _FILE_CACHE_SIZE:
+                _FILE_CACHE.pop(next(iter(_FILE_CACHE)), None)
+            _FILE_CACHE[key] = cached
         
-        validator = ConfigValidator()
-        return validator.validate_config(config)
+        # Callers modify the returned config, keep the cached copy intact
+        is_valid, config = cached
+        return is_valid, copy.deepcopy(config)
         
     except FileNotFoundError:
         logger.error(f"Configuration file not found: {config_path}")
@@ -4,15 +4,133 @@ Database Interface
 Handles SQLite database operations for event logging and data storage.
 """
 
+import gzip
 import sqlite3
 import json
 import logging
+import time
+import queue
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 logger = logging.getLogger(__name__)
 
+# JSON encoding for the events data column and exports; orjson when available
+if orjson is not None:
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    _json_loads = orjson.loads
+else:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+# Timestamps are passed as time.time() and formatted by SQLite into the
+# local ISO 8601 form datetime.now().isoformat() used to produce
+_SQL_TIMESTAMP = "strftime('%Y-%m-%dT%H:%M:%f', ?, 'unixepoch', 'localtime')"
+
+# SQLite 3.45+ stores event data as binary JSONB; older versions keep TEXT.
+# json() turns either form back into text on read
+_JSONB = sqlite3.sqlite_version_info >= (3, 45, 0)
+_SQL_EVENT_DATA = 'jsonb(?)' if _JSONB else '?'
+_SQL_SELECT_EVENT_DATA = 'json(data)' if _JSONB else 'data'
+
+# Weights and portions are stored as INTEGER centigrams, which SQLite packs
+# into 1-4 bytes instead of an 8 byte REAL
+_KG_TO_CG = 100000
+_G_TO_CG = 100
+
+# get_statistics results are reused until new feedings or events arrive,
+# or for at most this many seconds since the time window keeps moving
+_STATS_TTL = 60.0
+
+# system_logs.level is stored as a small integer; _LEVEL_NAME maps it back
+_LEVEL_NAME = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+_LEVEL_ID = {name: level_id for level_id, name in enumerate(_LEVEL_NAME)}
+
+# SQLite 3.37+ creates new tables STRICT, skipping type affinity conversion
+# on every insert. STRICT only allows INTEGER/REAL/TEXT/BLOB/ANY, so event
+# data is ANY to hold either JSON text or JSONB
+_STRICT = sqlite3.sqlite_version_info >= (3, 37, 0)
+
+# Current column definitions, used to create tables and to rebuild them
+# in migrations. The high-volume weight_readings and system_logs tables use
+# a plain rowid key; AUTOINCREMENT costs an extra sqlite_sequence write per
+# insert. events keeps it so get_recent_events can rely on id order
+_TABLE_COLUMNS = {
+    'events': f'''
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        data {'ANY' if _STRICT else 'TEXT'},
+        timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+    ''',
+    'weight_readings': '''
+        id INTEGER PRIMARY KEY,
+        weight INTEGER NOT NULL,
+        timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+    ''',
+    'feeding_records': '''
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        portion INTEGER NOT NULL,
+        cat_weight INTEGER,
+        timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+    ''',
+    'system_logs': '''
+        id INTEGER PRIMARY KEY,
+        level INTEGER NOT NULL CHECK(level BETWEEN 0 AND 3),
+        message TEXT NOT NULL,
+        timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+    ''',
+}
+
+# Schema DDL, each sent to SQLite as a single script. Existing tables are
+# left as they are, so only databases created on 3.37+ are STRICT
+_SQL_CREATE_TABLES = ''.join(
+    f"CREATE TABLE IF NOT EXISTS {table} ({columns}){' STRICT' if _STRICT else ''};"
+    for table, columns in _TABLE_COLUMNS.items()
+)
+_SQL_CREATE_INDEXES = '''
+    CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events(type, timestamp DESC);
+    CREATE INDEX IF NOT EXISTS idx_weight_timestamp ON weight_readings(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_feeding_timestamp ON feeding_records(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON system_logs(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_logs_level_ts ON system_logs(level, timestamp DESC);
+    
+    -- Superseded by idx_events_type_ts
+    DROP INDEX IF EXISTS idx_events_type;
+'''
+
+# Schema version stored in PRAGMA user_version
+_SCHEMA_VERSION = 3
+
+# Insert statements, kept as constants so the connection's statement cache
+# prepares each one once for the life of the process
+_SQL_INSERT_EVENT = f'INSERT INTO events (type, data, timestamp) VALUES (?, {_SQL_EVENT_DATA}, {_SQL_TIMESTAMP})'
+_SQL_INSERT_WEIGHT = f'INSERT INTO weight_readings (weight, timestamp) VALUES (?, {_SQL_TIMESTAMP})'
+_SQL_INSERT_FEEDING = f'INSERT INTO feeding_records (portion, cat_weight, timestamp) VALUES (?, ?, {_SQL_TIMESTAMP})'
+_SQL_INSERT_LOG = f'INSERT INTO system_logs (level, message, timestamp) VALUES (?, ?, {_SQL_TIMESTAMP})'
+
+# cleanup_old_data deletes old rows in chunks of at most _CLEANUP_CHUNK_ROWS,
+# each its own transaction, so the writer thread never waits long for the
+# write lock. Keyed by table, in the order the counts are logged.
+_CLEANUP_CHUNK_ROWS = 1000
+_SQL_CLEANUP = {
+    table: f'DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE timestamp < ? LIMIT ?)'
+    for table in ('events', 'weight_readings', 'system_logs')
+}
+
 class Database:
     def __init__(self, db_path: str = 'cat_feeder.db'):
         """
@@ -22,66 +140,239 @@ class Database:
             db_path: Path to SQLite database file
         """
         self.db_path = db_path
+        
+        # One connection for the life of the process, shared by all threads
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        
+        # High-volume inserts go through a queue to a writer thread with its
+        # own connection, so callers never wait on disk I/O. The writer
+        # commits once batch_size rows are queued or batch_interval has passed
+        self._queue: queue.Queue = queue.Queue(maxsize=10000)
+        self._batch_size = 200
+        self._batch_interval = 5.0
+        self._writer: Optional[threading.Thread] = None
+        
+        # get_statistics results by days, as (monotonic time, generation, result).
+        # log_event bumps the generation without taking _lock, so a result
+        # computed before a queued event is never served after it.
+        self._stats_cache: Dict[int, Tuple[float, int, Dict[str, Any]]] = {}
+        self._stats_generation = 0
+        
         self._initialize_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection in autocommit mode with the tuned pragmas"""
+        # The shared connection and the writer's can both write, so wait out
+        # the other's lock (busy_timeout) rather than failing with SQLITE_BUSY
+        conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False,
+                               isolation_level=None, cached_statements=256)
+        
+        # WAL lets readers run alongside the writer and only fsyncs on
+        # checkpoints; NORMAL sync is still crash-safe under WAL
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-16000')  # 16 MiB
+        conn.execute('PRAGMA mmap_size=134217728')  # 128 MiB
+        
+        return conn
+    
     def _initialize_database(self):
-        """Create database tables if they don't exist"""
+        """Open the connection and create database tables if they don't exist"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                self._conn = self._connect()
+                self._conn.row_factory = sqlite3.Row
+                cursor = self._conn.cursor()
                 
-                # Create events table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS events (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        type TEXT NOT NULL,
-                        data TEXT,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
+                new_database = cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'events'"
+                ).fetchone() is None
                 
-                # Create weight_readings table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS weight_readings (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        weight REAL NOT NULL,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
+                cursor.executescript(_SQL_CREATE_TABLES)
                 
-                # Create feeding_records table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS feeding_records (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        portion REAL NOT NULL,
-                        cat_weight REAL,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
+                # Fresh tables already have the current schema
+                if new_database:
+                    cursor.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
                 
-                # Create system_logs table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS system_logs (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        level TEXT NOT NULL,
-                        message TEXT NOT NULL,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
+                # Migrations may rebuild tables, so they run before the indexes
+                self._migrate(cursor)
                 
-                # Create indexes for better performance
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_type ON events(type)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_weight_timestamp ON weight_readings(timestamp)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_feeding_timestamp ON feeding_records(timestamp)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON system_logs(timestamp)')
+                cursor.executescript(_SQL_CREATE_INDEXES)
+                
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer.start()
                 
-                conn.commit()
                 logger.info("Database initialized successfully")
                 
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
     
+    def _migrate(self, cursor: sqlite3.Cursor):
+        """
+        Bring an existing database up to _SCHEMA_VERSION
+        
+        Args:
+            cursor: Cursor on the main connection
+        """
+        version = cursor.execute('PRAGMA user_version').fetchone()[0]
+        if version >= _SCHEMA_VERSION:
+            return
+        
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            if version < 1:
+                # REAL kilograms/grams to INTEGER centigrams
+                cursor.execute(f'UPDATE weight_readings SET weight = CAST(ROUND(weight * {_KG_TO_CG}) AS INTEGER)')
+                cursor.execute(f'''
+                    UPDATE feeding_records
+                    SET portion = CAST(ROUND(portion * {_G_TO_CG}) AS INTEGER),
+                        cat_weight = CAST(ROUND(cat_weight * {_KG_TO_CG}) AS INTEGER)
+                ''')
+            
+            if version < 2:
+                # TEXT log levels to INTEGER ids; the column affinity changes,
+                # so the table is rebuilt and its indexes recreated afterwards
+                self._rebuild_table(cursor, 'system_logs', '''
+                    SELECT id,
+                           CASE upper(level) WHEN 'DEBUG' THEN 0 WHEN 'WARNING' THEN 2
+                                             WHEN 'ERROR' THEN 3 ELSE 1 END,
+                           message, timestamp
+                    FROM system_logs
+                ''')
+            
+            if version < 3:
+                # Drop AUTOINCREMENT, which only a rebuild can remove;
+                # system_logs was already rebuilt above when coming from < 2
+                self._rebuild_table(cursor, 'weight_readings',
+                                    'SELECT id, weight, timestamp FROM weight_readings')
+                if version == 2:
+                    self._rebuild_table(cursor, 'system_logs',
+                                        'SELECT id, level, message, timestamp FROM system_logs')
+            
+            cursor.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        
+        logger.info(f"Database migrated from schema version {version} to {_SCHEMA_VERSION}")
+    
+    def _rebuild_table(self, cursor: sqlite3.Cursor, table: str, select_sql: str):
+        """
+        Recreate a table with its current columns, copying rows across
+        
+        Args:
+            cursor: Cursor inside the migration transaction
+            table: Table name in _TABLE_COLUMNS
+            select_sql: SELECT producing the new columns in order
+        """
+        cursor.execute(f'CREATE TABLE {table}_new ({_TABLE_COLUMNS[table]})')
+        cursor.execute(f'INSERT INTO {table}_new {select_sql}')
+        cursor.execute(f'DROP TABLE {table}')
+        cursor.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+    
+    def _queue_insert(self, sql: str, row: tuple):
+        """
+        Queue a row for the writer thread
+        
+        When the queue is full (e.g. a stalled SD card) the oldest row is
+        dropped so memory stays bounded.
+        
+        Args:
+            sql: INSERT statement
+            row: Parameters for the statement
+        """
+        item = (sql, row)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            try:
+                dropped = self._queue.get_nowait()
+                self._queue.task_done()
+                if isinstance(dropped, threading.Event):
+                    # Never drop a flush request, just release its waiter
+                    dropped.set()
+            except queue.Empty:
+                pass
+            
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                logger.warning("Database write queue full, dropping row")
+    
+    def _writer_loop(self):
+        """Write queued rows in batched transactions until close() is called"""
+        try:
+            conn = self._connect()
+        except Exception as e:
+            logger.error(f"Failed to open database writer connection: {e}")
+            return
+        
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._batch_interval
+            
+            # Keep collecting until the batch is full, the interval is up,
+            # or a flush/stop request arrives
+            while len(batch) < self._batch_size and isinstance(batch[-1], tuple):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            rows = [item for item in batch if isinstance(item, tuple)]
+            if rows:
+                self._write_batch(conn, rows)
+            
+            for item in batch:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    item.set()
+                self._queue.task_done()
+        
+        conn.close()
+    
+    def _write_batch(self, conn: sqlite3.Connection, rows: List[tuple]):
+        """Insert (sql, params) rows in a single transaction"""
+        grouped: Dict[str, List[tuple]] = {}
+        for sql, params in rows:
+            grouped.setdefault(sql, []).append(params)
+        
+        # Rows are dropped if the transaction fails, never retried
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                for sql, params in grouped.items():
+                    conn.executemany(sql, params)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except Exception as e:
+            logger.error(f"Failed to write {len(rows)} queued rows: {e}")
+    
+    def flush(self, timeout: float = 10.0):
+        """
+        Wait until every row queued so far has been written
+        
+        Args:
+            timeout: Maximum seconds to wait for the writer thread
+        """
+        if self._writer is None or not self._writer.is_alive():
+            return
+        
+        done = threading.Event()
+        self._queue.put(done)
+        if not done.wait(timeout):
+            logger.warning("Timed out waiting for database writer")
+    
     def log_event(self, event_type: str, data: Dict[str, Any] = None):
         """
         Log an event to the database
@@ -91,22 +382,35 @@ class Database:
             data: Additional event data as dictionary
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                data_json = json.dumps(data) if data else None
-                
-                cursor.execute('''
-                    INSERT INTO events (type, data, timestamp)
-                    VALUES (?, ?, ?)
-                ''', (event_type, data_json, datetime.now().isoformat()))
-                
-                conn.commit()
-                logger.debug(f"Logged event: {event_type}")
+            data_json = _json_dumps(data) if data else None
+            
+            self._queue_insert(_SQL_INSERT_EVENT, (event_type, data_json, time.time()))
+            self._stats_generation += 1
+            
+            logger.debug(f"Logged event: {event_type}")
                 
         except Exception as e:
             logger.error(f"Failed to log event: {e}")
     
+    def log_events(self, events: List[Tuple[str, Optional[Dict[str, Any]]]]):
+        """
+        Log several events to the database together
+        
+        Args:
+            events: (event_type, data) pairs, as taken by log_event
+        """
+        try:
+            now = time.time()
+            for event_type, data in events:
+                data_json = _json_dumps(data) if data else None
+                self._queue_insert(_SQL_INSERT_EVENT, (event_type, data_json, now))
+            self._stats_generation += 1
+            
+            logger.debug(f"Logged {len(events)} events")
+        
+        except Exception as e:
+            logger.error(f"Failed to log events: {e}")
+    
     def log_weight_reading(self, weight: float):
         """
         Log a weight reading
@@ -115,16 +419,8 @@ class Database:
             weight: Weight in kilograms
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO weight_readings (weight, timestamp)
-                    VALUES (?, ?)
-                ''', (weight, datetime.now().isoformat()))
-                
-                conn.commit()
-                
+            self._queue_insert(_SQL_INSERT_WEIGHT, (round(weight * _KG_TO_CG), time.time()))
+            
         except Exception as e:
             logger.error(f"Failed to log weight reading: {e}")
     
@@ -137,15 +433,16 @@ class Database:
             cat_weight: Cat weight at feeding time (optional)
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 
-                cursor.execute('''
-                    INSERT INTO feeding_records (portion, cat_weight, timestamp)
-                    VALUES (?, ?, ?)
-                ''', (portion, cat_weight, datetime.now().isoformat()))
+                cursor.execute(_SQL_INSERT_FEEDING, (
+                    round(portion * _G_TO_CG),
+                    round(cat_weight * _KG_TO_CG) if cat_weight is not None else None,
+                    time.time()
+                ))
+                self._stats_cache.clear()
                 
-                conn.commit()
                 logger.info(f"Logged feeding: {portion}g")
                 
         except Exception as e:
@@ -160,19 +457,22 @@ class Database:
             message: Log message
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO system_logs (level, message, timestamp)
-                    VALUES (?, ?, ?)
-                ''', (level, message, datetime.now().isoformat()))
-                
-                conn.commit()
-                
+            level_id = _LEVEL_ID.get(level.upper())
+            if level_id is None:
+                logger.error(f"Unknown log level: {level}")
+                return
+            
+            self._queue_insert(_SQL_INSERT_LOG, (level_id, message, time.time()))
+            
         except Exception as e:
             logger.error(f"Failed to log system message: {e}")
     
+    def _tuple_cursor(self) -> sqlite3.Cursor:
+        """Cursor returning plain tuples, cheaper to unpack than sqlite3.Row"""
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        return cursor
+    
     def get_recent_events(self, limit: int = 50) -> List[Dict[str, Any]]:
         """
         Get recent events
@@ -184,32 +484,31 @@ class Database:
             List of event dictionaries
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    SELECT type, data, timestamp
-                    FROM events
-                    ORDER BY timestamp DESC
-                    LIMIT ?
-                ''', (limit,))
-                
-                events = []
-                for row in cursor.fetchall():
-                    event = {
-                        'type': row['type'],
-                        'timestamp': row['timestamp'],
-                        'data': json.loads(row['data']) if row['data'] else None
-                    }
-                    events.append(event)
-                
-                return events
-                
+            return list(self._iter_recent_events(limit))
         except Exception as e:
             logger.error(f"Failed to get recent events: {e}")
             return []
     
+    def _iter_recent_events(self, limit: int) -> Iterator[Dict[str, Any]]:
+        """Yield recent events straight from the cursor"""
+        with self._lock:
+            self.flush()
+            # Ids follow insertion order, so the newest rows come straight
+            # off the end of the rowid B-tree without touching an index
+            cursor = self._tuple_cursor().execute(f'''
+                SELECT type, {_SQL_SELECT_EVENT_DATA} AS data, timestamp
+                FROM events
+                ORDER BY id DESC
+                LIMIT ?
+            ''', (limit,))
+            
+            for event_type, data, timestamp in cursor:
+                yield {
+                    'type': event_type,
+                    'timestamp': timestamp,
+                    'data': _json_loads(data) if data else None
+                }
+    
     def get_weight_history(self, hours: int = 24) -> List[Dict[str, Any]]:
         """
         Get weight history for specified hours
@@ -221,32 +520,106 @@ class Database:
             List of weight readings
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                cutoff_time = datetime.now() - timedelta(hours=hours)
-                
-                cursor.execute('''
-                    SELECT weight, timestamp
+            return list(self._iter_weight_history(hours))
+        except Exception as e:
+            logger.error(f"Failed to get weight history: {e}")
+            return []
+    
+    def _iter_weight_history(self, hours: int) -> Iterator[Dict[str, Any]]:
+        """Yield weight readings straight from the cursor"""
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        
+        with self._lock:
+            self.flush()
+            cursor = self._tuple_cursor().execute(f'''
+                SELECT weight / {_KG_TO_CG}.0 AS weight, timestamp
+                FROM weight_readings
+                WHERE timestamp >= ?
+                ORDER BY timestamp ASC
+            ''', (cutoff_time.isoformat(),))
+            
+            for weight, timestamp in cursor:
+                yield {'weight': weight, 'timestamp': timestamp}
+    
+    def get_weight_history_buckets(self, hours: int = 24,
+                                   bucket_seconds: int = 300) -> List[Dict[str, Any]]:
+        """
+        Get weight history averaged over fixed time buckets
+        
+        Args:
+            hours: Number of hours to look back
+            bucket_seconds: Width of each bucket
+            
+        Returns:
+            One entry per bucket with readings: its start time, and the mean,
+            minimum and maximum weight in kg
+        """
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        
+        try:
+            with self._lock:
+                self.flush()
+                # SQLite aggregates the range scan on idx_weight_timestamp, so
+                # only one row per bucket reaches Python
+                cursor = self._tuple_cursor().execute(f'''
+                    SELECT strftime('%Y-%m-%dT%H:%M:%S',
+                                    CAST(strftime('%s', timestamp) AS INTEGER) / :bucket * :bucket,
+                                    'unixepoch') AS bucket_start,
+                           AVG(weight) / {_KG_TO_CG}.0,
+                           MIN(weight) / {_KG_TO_CG}.0,
+                           MAX(weight) / {_KG_TO_CG}.0
+                    FROM weight_readings
+                    WHERE timestamp >= :cutoff
+                    GROUP BY bucket_start
+                    ORDER BY bucket_start ASC
+                ''', {'bucket': bucket_seconds, 'cutoff': cutoff_time.isoformat()})
+                
+                return [
+                    {'weight': mean, 'min_weight': low, 'max_weight': high, 'timestamp': start}
+                    for start, mean, low, high in cursor
+                ]
+            
+        except Exception as e:
+            logger.error(f"Failed to get weight history buckets: {e}")
+            return []
+    
+    def get_weight_history_arrays(self, hours: int = 24) -> Optional[Tuple[Any, Any]]:
+        """
+        Get weight history as NumPy arrays for vectorized analysis
+        
+        Args:
+            hours: Number of hours to look back
+            
+        Returns:
+            Tuple of (timestamps as datetime64[ms], weights in kg as float32),
+            or None if NumPy is not available or the query fails
+        """
+        if np is None:
+            logger.warning("NumPy not available - cannot build weight arrays")
+            return None
+        
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        
+        try:
+            with self._lock:
+                self.flush()
+                cursor = self._tuple_cursor().execute(f'''
+                    SELECT timestamp, weight / {_KG_TO_CG}.0
                     FROM weight_readings
                     WHERE timestamp >= ?
                     ORDER BY timestamp ASC
                 ''', (cutoff_time.isoformat(),))
                 
-                readings = []
-                for row in cursor.fetchall():
-                    reading = {
-                        'weight': row['weight'],
-                        'timestamp': row['timestamp']
-                    }
-                    readings.append(reading)
-                
-                return readings
-                
+                readings = np.fromiter(cursor, dtype=[
+                    ('timestamp', 'datetime64[ms]'),
+                    ('weight', 'float32')
+                ])
+            
+            return readings['timestamp'], readings['weight']
+            
         except Exception as e:
-            logger.error(f"Failed to get weight history: {e}")
-            return []
+            logger.error(f"Failed to get weight history arrays: {e}")
+            return None
     
     def get_feeding_history(self, days: int = 7) -> List[Dict[str, Any]]:
         """
@@ -259,34 +632,28 @@ class Database:
             List of feeding records
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                cutoff_time = datetime.now() - timedelta(days=days)
-                
-                cursor.execute('''
-                    SELECT portion, cat_weight, timestamp
-                    FROM feeding_records
-                    WHERE timestamp >= ?
-                    ORDER BY timestamp DESC
-                ''', (cutoff_time.isoformat(),))
-                
-                feedings = []
-                for row in cursor.fetchall():
-                    feeding = {
-                        'portion': row['portion'],
-                        'cat_weight': row['cat_weight'],
-                        'timestamp': row['timestamp']
-                    }
-                    feedings.append(feeding)
-                
-                return feedings
-                
+            return list(self._iter_feeding_history(days))
         except Exception as e:
             logger.error(f"Failed to get feeding history: {e}")
             return []
     
+    def _iter_feeding_history(self, days: int) -> Iterator[Dict[str, Any]]:
+        """Yield feeding records straight from the cursor"""
+        cutoff_time = datetime.now() - timedelta(days=days)
+        
+        with self._lock:
+            cursor = self._tuple_cursor().execute(f'''
+                SELECT portion / {_G_TO_CG}.0 AS portion,
+                       cat_weight / {_KG_TO_CG}.0 AS cat_weight,
+                       timestamp
+                FROM feeding_records
+                WHERE timestamp >= ?
+                ORDER BY timestamp DESC
+            ''', (cutoff_time.isoformat(),))
+            
+            for portion, cat_weight, timestamp in cursor:
+                yield {'portion': portion, 'cat_weight': cat_weight, 'timestamp': timestamp}
+    
     def get_system_logs(self, hours: int = 24, level: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get system logs
@@ -299,19 +666,23 @@ class Database:
             List of log entries
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
+            with self._lock:
+                self.flush()
+                cursor = self._tuple_cursor()
                 
                 cutoff_time = datetime.now() - timedelta(hours=hours)
                 
                 if level:
+                    level_id = _LEVEL_ID.get(level.upper())
+                    if level_id is None:
+                        return []
+                    
                     cursor.execute('''
                         SELECT level, message, timestamp
                         FROM system_logs
                         WHERE timestamp >= ? AND level = ?
                         ORDER BY timestamp DESC
-                    ''', (cutoff_time.isoformat(), level))
+                    ''', (cutoff_time.isoformat(), level_id))
                 else:
                     cursor.execute('''
                         SELECT level, message, timestamp
@@ -320,16 +691,10 @@ class Database:
                         ORDER BY timestamp DESC
                     ''', (cutoff_time.isoformat(),))
                 
-                logs = []
-                for row in cursor.fetchall():
-                    log_entry = {
-                        'level': row['level'],
-                        'message': row['message'],
-                        'timestamp': row['timestamp']
-                    }
-                    logs.append(log_entry)
-                
-                return logs
+                return [
+                    {'level': _LEVEL_NAME[level_id], 'message': message, 'timestamp': timestamp}
+                    for level_id, message, timestamp in cursor
+                ]
                 
         except Exception as e:
             logger.error(f"Failed to get system logs: {e}")
@@ -346,50 +711,47 @@ class Database:
             Dictionary of statistics
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                # Read before flushing, so any event queued after this
+                # point leaves the stored result stale
+                generation = self._stats_generation
+                cached = self._stats_cache.get(days)
+                if (cached is not None and cached[1] == generation
+                        and time.monotonic() - cached[0] < _STATS_TTL):
+                    return dict(cached[2])
+                
+                self.flush()
+                cursor = self._conn.cursor()
                 
                 cutoff_time = datetime.now() - timedelta(days=days)
                 
-                # Total feedings
-                cursor.execute('''
-                    SELECT COUNT(*), SUM(portion)
-                    FROM feeding_records
-                    WHERE timestamp >= ?
-                ''', (cutoff_time.isoformat(),))
-                
-                feeding_count, total_portion = cursor.fetchone()
-                feeding_count = feeding_count or 0
-                total_portion = total_portion or 0
-                
-                # Average cat weight
-                cursor.execute('''
-                    SELECT AVG(cat_weight)
-                    FROM feeding_records
-                    WHERE timestamp >= ? AND cat_weight IS NOT NULL
-                ''', (cutoff_time.isoformat(),))
-                
-                avg_weight = cursor.fetchone()[0] or 0
-                
-                # Cat detection count
-                cursor.execute('''
-                    SELECT COUNT(*)
-                    FROM events
-                    WHERE type = 'cat_detected' AND timestamp >= ?
-                ''', (cutoff_time.isoformat(),))
-                
-                cat_detections = cursor.fetchone()[0] or 0
-                
-                # Error count
-                cursor.execute('''
-                    SELECT COUNT(*)
-                    FROM events
-                    WHERE type = 'error' AND timestamp >= ?
-                ''', (cutoff_time.isoformat(),))
-                
-                error_count = cursor.fetchone()[0] or 0
-                
-                return {
+                # Feeding totals and event counts in one round trip;
+                # AVG already skips NULL cat weights
+                cursor.execute(f'''
+                    SELECT f.feeding_count, f.total_portion, f.avg_weight,
+                           e.cat_detections, e.error_count
+                    FROM (
+                        SELECT COUNT(*) AS feeding_count,
+                               SUM(portion) / {_G_TO_CG}.0 AS total_portion,
+                               AVG(cat_weight) / {_KG_TO_CG}.0 AS avg_weight
+                        FROM feeding_records
+                        WHERE timestamp >= :cutoff
+                    ) AS f, (
+                        SELECT SUM(type = 'cat_detected') AS cat_detections,
+                               SUM(type = 'error') AS error_count
+                        FROM events
+                        WHERE type IN ('cat_detected', 'error') AND timestamp >= :cutoff
+                    ) AS e
+                ''', {'cutoff': cutoff_time.isoformat()})
+                
+                row = cursor.fetchone()
+                feeding_count = row['feeding_count'] or 0
+                total_portion = row['total_portion'] or 0
+                avg_weight = row['avg_weight'] or 0
+                cat_detections = row['cat_detections'] or 0
+                error_count = row['error_count'] or 0
+                
+                stats = {
                     'feeding_count': feeding_count,
                     'total_portion': total_portion,
                     'avg_cat_weight': avg_weight,
@@ -397,39 +759,49 @@ class Database:
                     'error_count': error_count,
                     'period_days': days
                 }
+                self._stats_cache[days] = (time.monotonic(), generation, stats)
+                
+                return dict(stats)
                 
         except Exception as e:
             logger.error(f"Failed to get statistics: {e}")
             return {}
     
-    def cleanup_old_data(self, days: int = 30):
+    def cleanup_old_data(self, days: int = 30, chunk_size: int = _CLEANUP_CHUNK_ROWS):
         """
         Clean up old data to prevent database bloat
         
         Args:
             days: Keep data newer than this many days
+            chunk_size: Most rows deleted per transaction
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cutoff_time = datetime.now() - timedelta(days=days)
-                
-                # Delete old events
-                cursor.execute('DELETE FROM events WHERE timestamp < ?', (cutoff_time.isoformat(),))
-                events_deleted = cursor.rowcount
-                
-                # Delete old weight readings (keep more recent ones)
-                cursor.execute('DELETE FROM weight_readings WHERE timestamp < ?', (cutoff_time.isoformat(),))
-                weight_deleted = cursor.rowcount
-                
-                # Delete old system logs
-                cursor.execute('DELETE FROM system_logs WHERE timestamp < ?', (cutoff_time.isoformat(),))
-                logs_deleted = cursor.rowcount
-                
-                conn.commit()
+            self.flush()
+            
+            cutoff_time = datetime.now() - timedelta(days=days)
+            
+            cutoff = cutoff_time.isoformat()
+            
+            # Each chunk commits on its own, releasing the lock in between
+            deleted = []
+            for sql in _SQL_CLEANUP.values():
+                total = 0
+                while True:
+                    with self._lock:
+                        count = self._conn.execute(sql, (cutoff, chunk_size)).rowcount
+                    total += count
+                    if count < chunk_size:
+                        break
+                deleted.append(total)
+            events_deleted, weight_deleted, logs_deleted = deleted
+            
+            with self._lock:
+                self._stats_cache.clear()
                 
-                logger.info(f"Cleaned up old data: {events_deleted} events, {weight_deleted} weight readings, {logs_deleted} logs")
+                # Fold the WAL back into the database file and truncate it
+                self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            
+            logger.info(f"Cleaned up old data: {events_deleted} events, {weight_deleted} weight readings, {logs_deleted} logs")
                 
         except Exception as e:
             logger.error(f"Failed to cleanup old data: {e}")
@@ -439,19 +811,35 @@ class Database:
         Export database to JSON file
         
         Args:
-            export_path: Path to export file
+            export_path: Path to export file; a .gz suffix writes it gzip
+                compressed, which is faster than a plain write on an SD card
         """
         try:
-            export_data = {
-                'export_time': datetime.now().isoformat(),
-                'events': self.get_recent_events(1000),
-                'feeding_history': self.get_feeding_history(30),
-                'weight_history': self.get_weight_history(168),  # 7 days
-                'statistics': self.get_statistics(30)
-            }
+            sections = (
+                ('events', self._iter_recent_events(1000)),
+                ('feeding_history', self._iter_feeding_history(30)),
+                ('weight_history', self._iter_weight_history(168))  # 7 days
+            )
             
-            with open(export_path, 'w') as f:
-                json.dump(export_data, f, indent=2)
+            # Write rows as they come off the cursor instead of building the
+            # whole export in memory first
+            if str(export_path).endswith('.gz'):
+                opener = gzip.open(export_path, 'wt', compresslevel=3)
+            else:
+                opener = open(export_path, 'w')
+            
+            with self._lock, opener as f:
+                f.write('{\n  "export_time": ' + _json_dumps(datetime.now().isoformat()) + ',\n')
+                
+                for name, rows in sections:
+                    f.write(f'  "{name}": [')
+                    separator = '\n    '
+                    for row in rows:
+                        f.write(separator + _json_dumps(row))
+                        separator = ',\n    '
+                    f.write('\n  ],\n')
+                
+                f.write('  "statistics": ' + _json_dumps(self.get_statistics(30)) + '\n}\n')
             
             logger.info(f"Data exported to {export_path}")
             
@@ -466,7 +854,30 @@ class Database:
             Database file size
         """
         try:
-            return Path(self.db_path).stat().st_size
+            # Page count times page size from the open connection, no stat()
+            # of the file; in WAL mode this includes uncheckpointed pages
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT page_count * page_size FROM pragma_page_count(), pragma_page_size()'
+                ).fetchone()
+            return row[0]
         except Exception as e:
             logger.error(f"Failed to get database size: {e}")
-            return 0 
\ No newline at end of file
+            return 0
+    
+    def reopen(self):
+        """Open the database again after close(), e.g. once a restore has replaced it"""
+        self._stats_cache.clear()
+        self._initialize_database()
+    
+    def close(self):
+        """Write any queued rows and close the database connections"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=10.0)
+        
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                logger.info("Database connection closed")
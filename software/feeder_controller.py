@@ -5,9 +5,10 @@ Handles servo motor control for food dispensing
 """
 
 import time
+import queue
 import logging
 import threading
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 try:
     import RPi.GPIO as GPIO
@@ -15,8 +16,21 @@ except ImportError:
     # Mock for development/testing
     GPIO = None
 
+try:
+    import pigpio
+except ImportError:
+    pigpio = None
+
 logger = logging.getLogger(__name__)
 
+# Settings update_config accepts
+_CONFIG_KEYS = frozenset({'feeding_angle', 'portion_grams_per_second',
+                          'min_dispense_time', 'max_dispense_time'})
+
+def _clamp(value: float, low: float, high: float) -> float:
+    """Clamp value to the range [low, high]"""
+    return low if value < low else (high if value > high else value)
+
 class FeederController:
     def __init__(self, servo_pin: int, servo_min_angle: int = 0, 
                  servo_max_angle: int = 180, feeding_angle: int = 90):
@@ -38,44 +52,92 @@ class FeederController:
         self.frequency = 50  # Hz
         self.duty_cycle_min = 2.5  # %
         self.duty_cycle_max = 12.5  # %
+        self._duty_lut = self._build_duty_lut()
+        
+        # Pulse widths for pigpio's hardware-timed servo output; the same
+        # 0.5-2.5 ms range as the duty cycles above at 50 Hz
+        self.pulse_width_min = 500  # us
+        self.pulse_width_max = 2500  # us
+        self._pulse_lut = self._build_pulse_lut()
         
         # Feeding parameters
         self.portion_grams_per_second = 10  # grams per second of dispensing
+        self._inv_rate = 1.0 / self.portion_grams_per_second  # refreshed whenever the rate changes
         self.min_dispense_time = 0.5  # seconds
         self.max_dispense_time = 5.0  # seconds
         
-        # State
-        self.is_dispensing = False
+        # State; each job has its own stop event, and only the worker
+        # clears _dispensing once the job it ran has finished
+        self._dispensing = threading.Event()
+        self._stop_evt: Optional[threading.Event] = None
+        self._done_cv = threading.Condition()
+        
+        # Last get_status result and the values it was built from
+        self._status_key: Optional[tuple] = None
+        self._status_cache: Dict[str, Any] = {}
         self.current_angle = 0
         self.pwm = None
+        self._pi = None  # pigpio connection, preferred over self.pwm when available
+        self._last_output: Optional[float] = None  # last duty cycle/pulse width written
         self.lock = threading.Lock()
         
+        # Dispense jobs run on one long-lived worker thread; the single
+        # slot queue holds at most one pending (dispense time, stop event)
+        self._jobs: queue.Queue = queue.Queue(maxsize=1)
+        self._worker = threading.Thread(target=self._run_jobs, daemon=True)
+        self._worker.start()
+        
+        # Set once the servo has settled at rest after start-up
+        self._ready = threading.Event()
+        
         self._initialize_servo()
     
+    @property
+    def is_dispensing(self) -> bool:
+        """True while a dispense is queued or running"""
+        return self._dispensing.is_set()
+    
     def _initialize_servo(self):
         """Initialize the servo motor"""
         try:
-            if GPIO is None:
-                logger.warning("GPIO not available - using mock servo")
-                return
-            
-            # Setup GPIO
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setup(self.servo_pin, GPIO.OUT)
-            
-            # Setup PWM
-            self.pwm = GPIO.PWM(self.servo_pin, self.frequency)
-            self.pwm.start(0)
+            # pigpio drives the servo from DMA-timed hardware instead of
+            # RPi.GPIO's software PWM thread, so pulses don't jitter
+            if pigpio is not None:
+                pi = pigpio.pi()
+                if pi.connected:
+                    self._pi = pi
+                else:
+                    pi.stop()
+                    logger.warning("pigpio daemon not running - falling back to RPi.GPIO PWM")
+            
+            if self._pi is None:
+                if GPIO is None:
+                    logger.warning("GPIO not available - using mock servo")
+                    self._ready.set()
+                    return
+                
+                # Setup GPIO
+                GPIO.setmode(GPIO.BCM)
+                GPIO.setup(self.servo_pin, GPIO.OUT)
+                
+                # Setup PWM
+                self.pwm = GPIO.PWM(self.servo_pin, self.frequency)
+                self.pwm.start(0)
             
-            # Move to rest position
+            # Move to rest position and let it settle in the background
+            # instead of blocking start-up; dispensing waits for it
             self.set_angle(0)
-            time.sleep(1)
+            settle_timer = threading.Timer(1.0, self._ready.set)
+            settle_timer.daemon = True
+            settle_timer.start()
             
             logger.info("Servo motor initialized successfully")
             
         except Exception as e:
-            logger.error(f"Failed to initialize servo motor: {e}")
+            logger.error("Failed to initialize servo motor: %s", e)
             self.pwm = None
+            self._pi = None
+            self._ready.set()
     
     def set_angle(self, angle: int) -> bool:
         """
@@ -88,33 +150,70 @@ class FeederController:
             True if successful
         """
         try:
-            # Clamp angle to valid range
-            angle = max(self.servo_min_angle, min(self.servo_max_angle, angle))
+            # Clamp angle to valid range; comparisons are cheaper than max(min())
+            min_angle, max_angle = self.servo_min_angle, self.servo_max_angle
+            angle = min_angle if angle < min_angle else (max_angle if angle > max_angle else angle)
             
-            if self.pwm is None:
+            if self.pwm is None and self._pi is None:
                 logger.warning("Cannot set angle - servo not initialized")
                 return False
             
+            # After clamping, whole angles always index the lookup tables;
+            # fractional ones are mapped directly
+            whole = type(angle) is int and angle >= 0
+            
             with self.lock:
-                # Convert angle to duty cycle
-                duty_cycle = self._angle_to_duty_cycle(angle)
+                # Write the pulse width or duty cycle, skipping the write if
+                # it wouldn't change
+                if self._pi is not None:
+                    pulse_width = self._pulse_lut[angle] if whole else self._pulse_width(angle)
+                    if pulse_width != self._last_output:
+                        self._pi.set_servo_pulsewidth(self.servo_pin, pulse_width)
+                        self._last_output = pulse_width
+                    
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Servo set to %s° (pulse width: %dus)", angle, pulse_width)
+                else:
+                    if whole:
+                        duty_cycle = self._duty_lut[angle]
+                    else:
+                        # Map angle (0-180) to duty cycle (2.5%-12.5%)
+                        duty_min, duty_max = self.duty_cycle_min, self.duty_cycle_max
+                        duty_cycle = (angle / 180.0) * (duty_max - duty_min) + duty_min
+                    if duty_cycle != self._last_output:
+                        self.pwm.ChangeDutyCycle(duty_cycle)
+                        self._last_output = duty_cycle
+                    
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Servo set to %s° (duty cycle: %.1f%%)", angle, duty_cycle)
                 
-                # Set PWM duty cycle
-                self.pwm.ChangeDutyCycle(duty_cycle)
                 self.current_angle = angle
-                
-                logger.debug(f"Servo set to {angle}° (duty cycle: {duty_cycle:.1f}%)")
                 return True
                 
         except Exception as e:
-            logger.error(f"Failed to set servo angle: {e}")
+            logger.error("Failed to set servo angle: %s", e)
             return False
     
-    def _angle_to_duty_cycle(self, angle: int) -> float:
-        """Convert angle to PWM duty cycle"""
-        # Map angle (0-180) to duty cycle (2.5%-12.5%)
-        duty_cycle = (angle / 180.0) * (self.duty_cycle_max - self.duty_cycle_min) + self.duty_cycle_min
-        return duty_cycle
+    def _build_duty_lut(self) -> tuple:
+        """Precompute the duty cycle for every whole angle up to servo_max_angle"""
+        duty_range = self.duty_cycle_max - self.duty_cycle_min
+        return tuple((angle / 180.0) * duty_range + self.duty_cycle_min
+                     for angle in range(max(0, self.servo_max_angle) + 1))
+    
+    def _build_pulse_lut(self) -> tuple:
+        """Precompute the pulse width for every whole angle up to servo_max_angle"""
+        return tuple(self._pulse_width(angle) for angle in range(max(0, self.servo_max_angle) + 1))
+    
+    def _pulse_width(self, angle: float) -> int:
+        """Map angle (0-180) to a whole servo pulse width in microseconds"""
+        pulse_range = self.pulse_width_max - self.pulse_width_min
+        return int(round((angle / 180.0) * pulse_range + self.pulse_width_min))
+    
+    def _angle_to_pulse_width(self, angle: int) -> int:
+        """Convert angle to servo pulse width"""
+        if type(angle) is int and 0 <= angle < len(self._pulse_lut):
+            return self._pulse_lut[angle]
+        return self._pulse_width(angle)
     
     def dispense_food(self, portion_grams: float) -> bool:
         """
@@ -127,54 +226,109 @@ class FeederController:
             True if dispensing successful
         """
         try:
-            if self.is_dispensing:
-                logger.warning("Already dispensing food")
-                return False
-            
             # Calculate dispense time based on portion
-            dispense_time = portion_grams / self.portion_grams_per_second
-            dispense_time = max(self.min_dispense_time, min(self.max_dispense_time, dispense_time))
-            
-            logger.info(f"Dispensing {portion_grams}g of food over {dispense_time:.1f}s")
+            with self.lock:
+                dispense_time = _clamp(portion_grams * self._inv_rate,
+                                       self.min_dispense_time, self.max_dispense_time)
             
-            # Start dispensing in separate thread
-            dispense_thread = threading.Thread(
-                target=self._dispense_food_thread,
-                args=(dispense_time,),
-                daemon=True
-            )
-            dispense_thread.start()
+            if not self._submit_job(dispense_time):
+                return False
             
+            logger.info("Dispensing %sg of food over %.1fs", portion_grams, dispense_time)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to start food dispensing: {e}")
+            logger.error("Failed to start food dispensing: %s", e)
             return False
     
-    def _dispense_food_thread(self, dispense_time: float):
-        """Thread function for dispensing food"""
+    def _submit_job(self, dispense_time: float) -> bool:
+        """Claim the dispensing flag and hand a dispense job to the worker thread"""
+        stop_evt = threading.Event()
+        
+        # Check and set under the lock so two callers can't both start
+        with self.lock:
+            if self._dispensing.is_set():
+                logger.warning("Already dispensing food")
+                return False
+            self._dispensing.set()
+            self._stop_evt = stop_evt
+        
         try:
-            self.is_dispensing = True
+            self._jobs.put_nowait((dispense_time, stop_evt))
+            return True
+        except queue.Full:
+            # The job never reached the worker, so release our own claim
+            self._set_idle()
+            logger.warning("Already dispensing food")
+            return False
+    
+    def _run_jobs(self):
+        """Worker thread loop; a None job stops it"""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            self._dispense_food_thread(*job)
+    
+    def _dispense_food_thread(self, dispense_time: float, stop_evt: threading.Event):
+        """
+        Thread function for dispensing food
+        
+        Args:
+            dispense_time: Seconds to hold the feeding position
+            stop_evt: Set by stop_dispensing to end this job early
+        """
+        moved = False
+        try:
+            self._ready.wait()
+            
+            # stop_dispensing may have been called while the servo settled
+            if stop_evt.is_set():
+                logger.info("Food dispensing stopped")
+                return
+            
+            with self.lock:
+                feeding_angle = self.feeding_angle
             
             # Move to feeding position
-            if not self.set_angle(self.feeding_angle):
+            if not self.set_angle(feeding_angle):
                 logger.error("Failed to move servo to feeding position")
                 return
+            moved = True
             
-            # Hold position for dispense time
-            time.sleep(dispense_time)
-            
-            # Return to rest position
-            if not self.set_angle(0):
-                logger.error("Failed to return servo to rest position")
+            # Hold position for dispense time, or until stop_dispensing
+            if stop_evt.wait(dispense_time):
+                logger.info("Food dispensing stopped")
                 return
             
             logger.info("Food dispensing completed")
             
         except Exception as e:
-            logger.error(f"Error during food dispensing: {e}")
+            logger.error("Error during food dispensing: %s", e)
         finally:
-            self.is_dispensing = False
+            # Never leave the chute open, however the job ended
+            if moved and not self.set_angle(0):
+                logger.error("Failed to return servo to rest position")
+            self._set_idle()
+    
+    def _set_idle(self):
+        """Clear the dispensing flag and wake wait_until_idle callers"""
+        with self._done_cv:
+            self._dispensing.clear()
+            self._done_cv.notify_all()
+    
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until no dispense is queued or running
+        
+        Args:
+            timeout: Maximum time to wait in seconds (None waits forever)
+            
+        Returns:
+            True if the feeder is idle
+        """
+        with self._done_cv:
+            return self._done_cv.wait_for(lambda: not self._dispensing.is_set(), timeout)
     
     def dispense_food_manual(self, duration_seconds: float) -> bool:
         """
@@ -187,38 +341,29 @@ class FeederController:
             True if successful
         """
         try:
-            if self.is_dispensing:
-                logger.warning("Already dispensing food")
+            if not self._submit_job(duration_seconds):
                 return False
             
-            logger.info(f"Manual dispensing for {duration_seconds}s")
-            
-            # Start dispensing in separate thread
-            dispense_thread = threading.Thread(
-                target=self._dispense_food_thread,
-                args=(duration_seconds,),
-                daemon=True
-            )
-            dispense_thread.start()
-            
+            logger.info("Manual dispensing for %ss", duration_seconds)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to start manual dispensing: {e}")
+            logger.error("Failed to start manual dispensing: %s", e)
             return False
     
     def stop_dispensing(self):
         """Stop current dispensing operation"""
         try:
-            if self.is_dispensing:
+            if self._dispensing.is_set():
                 logger.info("Stopping food dispensing")
+                self._stop_evt.set()
                 
-                # Return to rest position
+                # Return to rest position; the worker clears the dispensing
+                # flag once the job has wound down
                 self.set_angle(0)
-                self.is_dispensing = False
                 
         except Exception as e:
-            logger.error(f"Error stopping dispensing: {e}")
+            logger.error("Error stopping dispensing: %s", e)
     
     def test_servo(self) -> bool:
         """
@@ -232,20 +377,69 @@ class FeederController:
             
             # Test full range of motion
             test_angles = [0, 45, 90, 135, 180, 90, 0]
+            step_time = 0.5
             
-            for angle in test_angles:
+            # With pigpio the whole sweep is one hardware-timed waveform
+            if self._pi is not None:
+                self._run_servo_wave(test_angles, step_time)
+                logger.info("Servo test completed successfully")
+                return True
+            
+            # Sleep to absolute deadlines so sleep overshoot doesn't accumulate
+            start = time.monotonic()
+            for i, angle in enumerate(test_angles, 1):
                 if not self.set_angle(angle):
-                    logger.error(f"Failed to set angle to {angle}°")
+                    logger.error("Failed to set angle to %s°", angle)
                     return False
-                time.sleep(0.5)
+                time.sleep(max(0.0, start + i * step_time - time.monotonic()))
             
             logger.info("Servo test completed successfully")
             return True
             
         except Exception as e:
-            logger.error(f"Servo test failed: {e}")
+            logger.error("Servo test failed: %s", e)
             return False
     
+    def _run_servo_wave(self, angles: List[int], step_time: float):
+        """
+        Play a sequence of servo positions as a single pigpio waveform
+        
+        Args:
+            angles: Angles to visit in order
+            step_time: Time to hold each angle in seconds
+        """
+        pi = self._pi
+        mask = 1 << self.servo_pin
+        period = 1000000 // self.frequency  # us
+        repeats = max(1, int(step_time * self.frequency))
+        
+        pulses = []
+        for angle in angles:
+            angle = _clamp(angle, self.servo_min_angle, self.servo_max_angle)
+            pulse_width = self._angle_to_pulse_width(angle)
+            pulses += [pigpio.pulse(mask, 0, pulse_width),
+                       pigpio.pulse(0, mask, period - pulse_width)] * repeats
+        
+        with self.lock:
+            # Servo pulses and waves can't share the pin, so pause the former
+            pi.set_servo_pulsewidth(self.servo_pin, 0)
+            pi.set_mode(self.servo_pin, pigpio.OUTPUT)
+            
+            pi.wave_add_generic(pulses)
+            wave_id = pi.wave_create()
+            try:
+                pi.wave_send_once(wave_id)
+                time.sleep(len(angles) * step_time)
+                while pi.wave_tx_busy():
+                    time.sleep(0.01)
+            finally:
+                pi.wave_delete(wave_id)
+            
+            # Hold the final position with regular servo pulses again
+            pi.set_servo_pulsewidth(self.servo_pin, pulse_width)
+            self._last_output = pulse_width
+            self.current_angle = angle
+    
     def calibrate_portion(self, known_weight_grams: float, dispense_time: float) -> bool:
         """
         Calibrate portion dispensing rate
@@ -266,57 +460,78 @@ class FeederController:
             new_rate = known_weight_grams / dispense_time
             old_rate = self.portion_grams_per_second
             
+            self._inv_rate = 1.0 / new_rate
             self.portion_grams_per_second = new_rate
             
-            logger.info(f"Portion rate calibrated: {old_rate:.1f} -> {new_rate:.1f} g/s")
+            logger.info("Portion rate calibrated: %.1f -> %.1f g/s", old_rate, new_rate)
             return True
             
         except Exception as e:
-            logger.error(f"Portion calibration failed: {e}")
+            logger.error("Portion calibration failed: %s", e)
             return False
     
     def get_status(self) -> Dict[str, Any]:
         """Get current feeder status"""
-        return {
-            'is_dispensing': self.is_dispensing,
-            'current_angle': self.current_angle,
-            'portion_rate': self.portion_grams_per_second,
-            'servo_initialized': self.pwm is not None
-        }
+        # Rebuild the status dict only when one of its values changed
+        key = (self._dispensing.is_set(), self.current_angle,
+               self.portion_grams_per_second, self.pwm is not None or self._pi is not None)
+        if key != self._status_key:
+            self._status_key = key
+            self._status_cache = {
+                'is_dispensing': key[0],
+                'current_angle': key[1],
+                'portion_rate': key[2],
+                'servo_initialized': key[3]
+            }
+        
+        return self._status_cache.copy()
     
     def update_config(self, config: Dict[str, Any]):
         """Update feeder configuration"""
-        if 'feeding_angle' in config:
-            self.feeding_angle = config['feeding_angle']
-        
-        if 'portion_grams_per_second' in config:
-            self.portion_grams_per_second = config['portion_grams_per_second']
-        
-        if 'min_dispense_time' in config:
-            self.min_dispense_time = config['min_dispense_time']
-        
-        if 'max_dispense_time' in config:
-            self.max_dispense_time = config['max_dispense_time']
+        # Apply all settings under the lock so a dispense never sees a mix
+        # of old and new values
+        with self.lock:
+            for key in _CONFIG_KEYS & config.keys():
+                setattr(self, key, config[key])
+            
+            if 'portion_grams_per_second' in config:
+                self._inv_rate = 1.0 / self.portion_grams_per_second
         
         logger.info("Feeder configuration updated")
     
     def cleanup(self):
         """Clean up GPIO resources"""
         try:
-            if self.is_dispensing:
+            if self._dispensing.is_set():
                 self.stop_dispensing()
             
-            if self.pwm is not None:
-                self.pwm.stop()
-                self.pwm = None
-            
-            if GPIO is not None:
-                GPIO.cleanup([self.servo_pin])
+            # Drop any pending job and stop the worker
+            try:
+                self._jobs.get_nowait()
+                # The dropped job will never run to clear its own flag
+                self._set_idle()
+            except queue.Empty:
+                pass
+            self._jobs.put_nowait(None)
+            self._worker.join(timeout=2.0)
+            
+            if self._pi is not None:
+                # A pulse width of 0 switches the servo output off
+                self._pi.set_servo_pulsewidth(self.servo_pin, 0)
+                self._pi.stop()
+                self._pi = None
+            else:
+                if self.pwm is not None:
+                    self.pwm.stop()
+                    self.pwm = None
+                
+                if GPIO is not None:
+                    GPIO.cleanup([self.servo_pin])
             
             logger.info("Feeder controller cleaned up")
             
         except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
+            logger.error("Error during cleanup: %s", e)
 
 class FeederCalibrator:
     """Helper class for feeder calibration"""
@@ -381,8 +596,7 @@ class FeederCalibrator:
                 return False
             
             # Wait for completion
-            while self.feeder_controller.is_dispensing:
-                time.sleep(0.1)
+            self.feeder_controller.wait_until_idle()
             
             print("Dispensing completed")
             
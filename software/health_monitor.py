@@ -4,17 +4,52 @@ Health Monitor
 Monitors system health and provides alerts for issues
 """
 
+import os
+import json
 import time
 import threading
 import logging
 import psutil
 import sqlite3
+from collections import deque
+from itertools import islice
+from statistics import fmean
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Metrics sampled every health check, each kept as a deque of
+# (epoch seconds, value) tuples
+_METRIC_TYPES = ('cpu_usage', 'memory_usage', 'disk_usage', 'temperature')
+_METRIC_RETENTION_DAYS = 7
+
+# Alert type and message raised when a metric's latest value exceeds its threshold
+_METRIC_ALERTS = (
+    ('cpu_usage', 'high_cpu_usage', "CPU usage: %.1f%%"),
+    ('memory_usage', 'high_memory_usage', "Memory usage: %.1f%%"),
+    ('disk_usage', 'high_disk_usage', "Disk usage: %.1f%%"),
+    ('temperature', 'high_temperature', "CPU temperature: %.1f°C"),
+)
+
+# Disk usage changes slowly, so statvfs('/') is re-read at most this often
+_DISK_CACHE_SECONDS = 300
+
+# How long database and log file sizes are cached, in seconds
+_SIZE_CACHE_SECONDS = 30
+
+# CPU temperature files in millidegrees Celsius, in order of preference
+_TEMP_FILES = (
+    '/sys/class/thermal/thermal_zone0/temp',
+    '/sys/class/hwmon/hwmon0/temp1_input',
+    '/sys/class/hwmon/hwmon1/temp1_input'
+)
+
 class HealthMonitor:
     """Monitors system health and performance"""
     
@@ -31,15 +66,36 @@ class HealthMonitor:
         self.running = False
         self.health_thread = None
         
-        # Health metrics
-        self.metrics = {
-            'cpu_usage': [],
-            'memory_usage': [],
-            'disk_usage': [],
-            'temperature': [],
-            'uptime': 0,
-            'last_check': None
-        }
+        # Set by stop() to cut the wait between checks short
+        self._stop_event = threading.Event()
+        
+        # Seconds between health checks
+        self._interval_s = 30 * 60
+        self.update_interval()
+        
+        # Health metrics; deques are sized to hold the retention period
+        max_samples = _METRIC_RETENTION_DAYS * 24 * 3600 // max(60, int(self._interval_s)) + 1
+        self.metrics = {metric_type: deque(maxlen=max_samples) for metric_type in _METRIC_TYPES}
+        self.metrics['uptime'] = 0
+        self.metrics['last_check'] = None
+        
+        # Prime psutil's CPU counters so the first non-blocking
+        # cpu_percent() call has a baseline to measure against
+        psutil.cpu_percent(interval=None)
+        
+        # Boot time doesn't change while running; psutil reads /proc for it
+        self._boot_time = psutil.boot_time()
+        
+        # Last disk usage reading and when it was taken
+        self._disk_percent = 0.0
+        self._disk_cache_ts = 0.0
+        
+        # (expiry time, size in MB) of the database and log files, shared by
+        # the threshold checks and get_health_status
+        self._size_cache = {'db': (0.0, 0.0), 'log': (0.0, 0.0)}
+        
+        # The temperature file is opened once and re-read in place
+        self._temp_fd = self._open_temperature_file()
         
         # Alert thresholds
         self.thresholds = {
@@ -51,9 +107,16 @@ class HealthMonitor:
             'log_size_mb': 50,  # MB
         }
         
-        # Alert history
-        self.alerts = []
+        # Whether the latest metrics were all within their thresholds, as of
+        # the last check
+        self._healthy = True
+        
+        # Alert history, oldest first
         self.max_alerts = 100
+        self.alerts = deque(maxlen=self.max_alerts)
+        
+        # Alerts raised during the current check, logged to the database together
+        self._pending_alerts: List[Dict[str, Any]] = []
     
     def start(self):
         """Start health monitoring"""
@@ -62,6 +125,7 @@ class HealthMonitor:
             return
         
         self.running = True
+        self._stop_event.clear()
         self.health_thread = threading.Thread(target=self._monitoring_loop, daemon=True)
         self.health_thread.start()
         logger.info("Health monitor started")
@@ -69,10 +133,16 @@ class HealthMonitor:
     def stop(self):
         """Stop health monitoring"""
         self.running = False
+        self._stop_event.set()
         if self.health_thread:
             self.health_thread.join(timeout=5)
         logger.info("Health monitor stopped")
     
+    def update_interval(self):
+        """Re-read the health check interval from the configuration"""
+        interval = self.config.get('maintenance', {}).get('health_check_interval_minutes', 30)
+        self._interval_s = interval * 60
+    
     def _monitoring_loop(self):
         """Main monitoring loop"""
         while self.running:
@@ -82,134 +152,123 @@ class HealthMonitor:
                 self._cleanup_old_data()
                 
                 # Sleep for configured interval
-                interval = self.config.get('maintenance', {}).get('health_check_interval_minutes', 30)
-                time.sleep(interval * 60)
+                self._stop_event.wait(self._interval_s)
                 
             except Exception as e:
-                logger.error(f"Error in health monitoring: {e}")
-                time.sleep(60)  # Wait before retrying
+                logger.error("Error in health monitoring: %s", e)
+                self._stop_event.wait(60)  # Wait before retrying
     
     def _collect_metrics(self):
         """Collect system metrics"""
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            self.metrics['cpu_usage'].append({
-                'value': cpu_percent,
-                'timestamp': datetime.now().isoformat()
-            })
+            # CPU usage since the previous call; doesn't block the thread
+            cpu_percent = psutil.cpu_percent(interval=None)
+            now = time.time()
+            self.metrics['cpu_usage'].append((now, cpu_percent))
             
             # Memory usage
             memory = psutil.virtual_memory()
-            self.metrics['memory_usage'].append({
-                'value': memory.percent,
-                'timestamp': datetime.now().isoformat()
-            })
+            self.metrics['memory_usage'].append((now, memory.percent))
             
             # Disk usage
-            disk = psutil.disk_usage('/')
-            disk_percent = (disk.used / disk.total) * 100
-            self.metrics['disk_usage'].append({
-                'value': disk_percent,
-                'timestamp': datetime.now().isoformat()
-            })
+            if now - self._disk_cache_ts > _DISK_CACHE_SECONDS:
+                disk = psutil.disk_usage('/')
+                self._disk_percent = (disk.used / disk.total) * 100
+                self._disk_cache_ts = now
+            self.metrics['disk_usage'].append((now, self._disk_percent))
             
             # Temperature (if available)
             try:
                 temp = self._get_cpu_temperature()
                 if temp is not None:
-                    self.metrics['temperature'].append({
-                        'value': temp,
-                        'timestamp': datetime.now().isoformat()
-                    })
+                    self.metrics['temperature'].append((now, temp))
             except Exception as e:
-                logger.debug(f"Could not read temperature: {e}")
+                logger.debug("Could not read temperature: %s", e)
             
             # Uptime
-            self.metrics['uptime'] = time.time() - psutil.boot_time()
-            self.metrics['last_check'] = datetime.now().isoformat()
-            
-            # Keep only recent metrics (last 24 hours)
-            cutoff_time = datetime.now() - timedelta(hours=24)
-            for metric_type in ['cpu_usage', 'memory_usage', 'disk_usage', 'temperature']:
-                self.metrics[metric_type] = [
-                    m for m in self.metrics[metric_type]
-                    if datetime.fromisoformat(m['timestamp']) > cutoff_time
-                ]
+            self.metrics['uptime'] = now - self._boot_time
+            self.metrics['last_check'] = datetime.fromtimestamp(now).isoformat()
             
             logger.debug("Health metrics collected")
             
         except Exception as e:
-            logger.error(f"Error collecting metrics: {e}")
+            logger.error("Error collecting metrics: %s", e)
+    
+    def _trim_metrics(self, cutoff: float):
+        """Drop metric samples taken at or before cutoff (epoch seconds)"""
+        # Samples are appended in time order, so old ones are all at the left
+        for metric_type in _METRIC_TYPES:
+            samples = self.metrics[metric_type]
+            while samples and samples[0][0] <= cutoff:
+                samples.popleft()
+    
+    def _open_temperature_file(self) -> Optional[int]:
+        """Open the first available CPU temperature file, returning its descriptor"""
+        for temp_file in _TEMP_FILES:
+            try:
+                return os.open(temp_file, os.O_RDONLY)
+            except OSError:
+                continue
+        return None
     
     def _get_cpu_temperature(self) -> Optional[float]:
         """Get CPU temperature in Celsius"""
         try:
-            # Try different temperature file locations
-            temp_files = [
-                '/sys/class/thermal/thermal_zone0/temp',
-                '/sys/class/hwmon/hwmon0/temp1_input',
-                '/sys/class/hwmon/hwmon1/temp1_input'
-            ]
-            
-            for temp_file in temp_files:
-                if Path(temp_file).exists():
-                    with open(temp_file, 'r') as f:
-                        temp_raw = int(f.read().strip())
-                        return temp_raw / 1000.0  # Convert millidegrees to degrees
+            if self._temp_fd is None:
+                return None
             
+            # sysfs regenerates the value on every read from offset 0
+            temp_raw = int(os.pread(self._temp_fd, 16, 0))
+            return temp_raw / 1000.0  # Convert millidegrees to degrees
+        
+        except OSError as e:
+            # The sensor went away (e.g. ENODEV); look for it again
+            logger.debug("Could not read CPU temperature: %s", e)
+            os.close(self._temp_fd)
+            self._temp_fd = self._open_temperature_file()
             return None
-            
+        
         except Exception as e:
-            logger.debug(f"Could not read CPU temperature: {e}")
+            logger.debug("Could not read CPU temperature: %s", e)
             return None
     
     def _check_thresholds(self):
         """Check if any metrics exceed thresholds"""
         try:
-            # Check CPU usage
-            if self.metrics['cpu_usage']:
-                latest_cpu = self.metrics['cpu_usage'][-1]['value']
-                if latest_cpu > self.thresholds['cpu_usage']:
-                    self._create_alert('high_cpu_usage', f"CPU usage: {latest_cpu:.1f}%")
-            
-            # Check memory usage
-            if self.metrics['memory_usage']:
-                latest_memory = self.metrics['memory_usage'][-1]['value']
-                if latest_memory > self.thresholds['memory_usage']:
-                    self._create_alert('high_memory_usage', f"Memory usage: {latest_memory:.1f}%")
-            
-            # Check disk usage
-            if self.metrics['disk_usage']:
-                latest_disk = self.metrics['disk_usage'][-1]['value']
-                if latest_disk > self.thresholds['disk_usage']:
-                    self._create_alert('high_disk_usage', f"Disk usage: {latest_disk:.1f}%")
-            
-            # Check temperature
-            if self.metrics['temperature']:
-                latest_temp = self.metrics['temperature'][-1]['value']
-                if latest_temp > self.thresholds['temperature']:
-                    self._create_alert('high_temperature', f"CPU temperature: {latest_temp:.1f}°C")
+            # All alerts from one check share its timestamp
+            timestamp = datetime.now().isoformat()
+            
+            # Check CPU, memory, disk usage and temperature
+            healthy = True
+            for metric_type, alert_type, message in _METRIC_ALERTS:
+                latest = self._latest_value(metric_type)
+                if latest is not None and latest > self.thresholds[metric_type]:
+                    healthy = False
+                    self._create_alert(alert_type, message % latest, timestamp)
+            self._healthy = healthy
             
             # Check database size
             db_size = self._get_database_size()
             if db_size > self.thresholds['database_size_mb']:
-                self._create_alert('large_database', f"Database size: {db_size:.1f}MB")
+                self._create_alert('large_database', f"Database size: {db_size:.1f}MB", timestamp)
             
             # Check log file size
             log_size = self._get_log_size()
             if log_size > self.thresholds['log_size_mb']:
-                self._create_alert('large_log_file', f"Log file size: {log_size:.1f}MB")
-            
+                self._create_alert('large_log_file', f"Log file size: {log_size:.1f}MB", timestamp)
+        
         except Exception as e:
-            logger.error(f"Error checking thresholds: {e}")
+            logger.error("Error checking thresholds: %s", e)
+        
+        finally:
+            self._log_pending_alerts()
     
-    def _create_alert(self, alert_type: str, message: str):
+    def _create_alert(self, alert_type: str, message: str, timestamp: Optional[str] = None):
         """Create and log an alert"""
         alert = {
             'type': alert_type,
             'message': message,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp or datetime.now().isoformat(),
             'severity': 'warning'
         }
         
@@ -221,65 +280,82 @@ class HealthMonitor:
         else:
             alert['severity'] = 'info'
         
-        # Add to alerts list
+        # Add to alerts list; the deque drops the oldest beyond max_alerts
         self.alerts.append(alert)
         
-        # Keep only recent alerts
-        if len(self.alerts) > self.max_alerts:
-            self.alerts = self.alerts[-self.max_alerts:]
-        
-        # Log to database
-        self.database.log_event('health_alert', alert)
+        # Queue for the database; written once the whole check has run
+        self._pending_alerts.append(alert)
         
         # Log to console
         log_level = logging.ERROR if alert['severity'] == 'critical' else logging.WARNING
-        logger.log(log_level, f"Health alert: {message}")
+        logger.log(log_level, "Health alert: %s", message)
+    
+    def _log_pending_alerts(self):
+        """Log the alerts raised during the current check to the database"""
+        if not self._pending_alerts:
+            return
+        
+        alerts, self._pending_alerts = self._pending_alerts, []
+        self.database.log_events([('health_alert', alert) for alert in alerts])
+    
+    def _get_file_size(self, key: str, path: str) -> float:
+        """
+        Get a file's size in MB, cached for _SIZE_CACHE_SECONDS
+        
+        Args:
+            key: Cache key ('db' or 'log')
+            path: File path
+        
+        Returns:
+            Size in MB, or 0.0 if the file doesn't exist
+        """
+        now = time.time()
+        expiry, size_mb = self._size_cache[key]
+        if now < expiry:
+            return size_mb
+        
+        try:
+            size_mb = os.stat(path).st_size / (1024 * 1024)  # Convert to MB
+        except FileNotFoundError:
+            size_mb = 0.0
+        
+        self._size_cache[key] = (now + _SIZE_CACHE_SECONDS, size_mb)
+        return size_mb
     
     def _get_database_size(self) -> float:
         """Get database file size in MB"""
         try:
             db_path = self.config.get('database', {}).get('path', 'cat_feeder.db')
-            if Path(db_path).exists():
-                size_bytes = Path(db_path).stat().st_size
-                return size_bytes / (1024 * 1024)  # Convert to MB
-            return 0.0
+            return self._get_file_size('db', db_path)
         except Exception as e:
-            logger.error(f"Error getting database size: {e}")
+            logger.error("Error getting database size: %s", e)
             return 0.0
     
     def _get_log_size(self) -> float:
         """Get log file size in MB"""
         try:
             log_file = self.config.get('logging', {}).get('file', 'cat_feeder.log')
-            if Path(log_file).exists():
-                size_bytes = Path(log_file).stat().st_size
-                return size_bytes / (1024 * 1024)  # Convert to MB
-            return 0.0
+            return self._get_file_size('log', log_file)
         except Exception as e:
-            logger.error(f"Error getting log file size: {e}")
+            logger.error("Error getting log file size: %s", e)
             return 0.0
     
     def _cleanup_old_data(self):
         """Clean up old health data"""
         try:
             # Clean up old metrics (keep last 7 days)
-            cutoff_time = datetime.now() - timedelta(days=7)
+            self._trim_metrics(time.time() - _METRIC_RETENTION_DAYS * 24 * 3600)
             
-            for metric_type in ['cpu_usage', 'memory_usage', 'disk_usage', 'temperature']:
-                self.metrics[metric_type] = [
-                    m for m in self.metrics[metric_type]
-                    if datetime.fromisoformat(m['timestamp']) > cutoff_time
-                ]
-            
-            # Clean up old alerts (keep last 30 days)
-            cutoff_time = datetime.now() - timedelta(days=30)
-            self.alerts = [
-                alert for alert in self.alerts
-                if datetime.fromisoformat(alert['timestamp']) > cutoff_time
-            ]
+            # Clean up old alerts (keep last 30 days); like metrics they're
+            # in time order, so only the head is checked. isoformat() strings
+            # sort chronologically, so they're compared without parsing
+            cutoff_time = (datetime.now() - timedelta(days=30)).isoformat()
+            alerts = self.alerts
+            while alerts and alerts[0]['timestamp'] <= cutoff_time:
+                alerts.popleft()
             
         except Exception as e:
-            logger.error(f"Error cleaning up old data: {e}")
+            logger.error("Error cleaning up old data: %s", e)
     
     def get_health_status(self) -> Dict[str, Any]:
         """Get current health status"""
@@ -291,10 +367,10 @@ class HealthMonitor:
             temp_avg = self._calculate_average('temperature', 10)
             
             # Get latest values
-            latest_cpu = self.metrics['cpu_usage'][-1]['value'] if self.metrics['cpu_usage'] else 0
-            latest_memory = self.metrics['memory_usage'][-1]['value'] if self.metrics['memory_usage'] else 0
-            latest_disk = self.metrics['disk_usage'][-1]['value'] if self.metrics['disk_usage'] else 0
-            latest_temp = self.metrics['temperature'][-1]['value'] if self.metrics['temperature'] else None
+            latest_cpu = self._latest_value('cpu_usage', 0)
+            latest_memory = self._latest_value('memory_usage', 0)
+            latest_disk = self._latest_value('disk_usage', 0)
+            latest_temp = self._latest_value('temperature')
             
             return {
                 'status': 'healthy' if self._is_healthy() else 'warning',
@@ -322,70 +398,68 @@ class HealthMonitor:
                 },
                 'database_size_mb': self._get_database_size(),
                 'log_size_mb': self._get_log_size(),
-                'recent_alerts': self.alerts[-10:] if self.alerts else []
+                'recent_alerts': list(self.alerts)[-10:]
             }
             
         except Exception as e:
-            logger.error(f"Error getting health status: {e}")
+            logger.error("Error getting health status: %s", e)
             return {'status': 'error', 'error': str(e)}
     
+    def _latest_value(self, metric_type: str, default: Optional[float] = None) -> Optional[float]:
+        """Get the newest value of a metric, or default if there are none"""
+        # Index once rather than checking for samples first: the monitor
+        # thread may evict the last sample in between
+        try:
+            return self.metrics[metric_type][-1][1]
+        except IndexError:
+            return default
+    
     def _calculate_average(self, metric_type: str, count: int) -> float:
         """Calculate average of recent metric values"""
         try:
-            metrics = self.metrics[metric_type][-count:]
-            if not metrics:
-                return 0.0
-            
-            total = sum(m['value'] for m in metrics)
-            return total / len(metrics)
+            # Copy the newest samples first; list() runs without releasing the
+            # GIL, so the monitor thread can't append mid-iteration
+            values = [value for _, value in list(islice(reversed(self.metrics[metric_type]), count))]
+            return fmean(values) if values else 0.0
             
         except Exception as e:
-            logger.error(f"Error calculating average for {metric_type}: {e}")
+            logger.error("Error calculating average for %s: %s", metric_type, e)
             return 0.0
     
     def _is_healthy(self) -> bool:
         """Check if system is healthy"""
-        try:
-            # Check if any metrics exceed thresholds
-            if self.metrics['cpu_usage'] and self.metrics['cpu_usage'][-1]['value'] > self.thresholds['cpu_usage']:
-                return False
-            
-            if self.metrics['memory_usage'] and self.metrics['memory_usage'][-1]['value'] > self.thresholds['memory_usage']:
-                return False
-            
-            if self.metrics['disk_usage'] and self.metrics['disk_usage'][-1]['value'] > self.thresholds['disk_usage']:
-                return False
-            
-            if self.metrics['temperature'] and self.metrics['temperature'][-1]['value'] > self.thresholds['temperature']:
-                return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error checking health status: {e}")
-            return False
+        # Metrics only change on the monitor thread, which re-evaluates this
+        # in _check_thresholds right after collecting them
+        return self._healthy
     
     def get_metrics_history(self, hours: int = 24) -> Dict[str, List[Dict[str, Any]]]:
         """Get metrics history for specified hours"""
         try:
-            cutoff_time = datetime.now() - timedelta(hours=hours)
+            cutoff = time.time() - hours * 3600
             
+            # Timestamps are only formatted here, for the samples returned
             history = {}
-            for metric_type in ['cpu_usage', 'memory_usage', 'disk_usage', 'temperature']:
+            for metric_type in _METRIC_TYPES:
                 history[metric_type] = [
-                    m for m in self.metrics[metric_type]
-                    if datetime.fromisoformat(m['timestamp']) > cutoff_time
+                    {'value': value, 'timestamp': datetime.fromtimestamp(timestamp).isoformat()}
+                    for timestamp, value in list(self.metrics[metric_type])
+                    if timestamp > cutoff
                 ]
             
             return history
             
         except Exception as e:
-            logger.error(f"Error getting metrics history: {e}")
+            logger.error("Error getting metrics history: %s", e)
             return {}
     
+    def get_metric_values(self, metric_type: str, hours: int = 24) -> List[float]:
+        """Get the values of one metric from the last hours, oldest first"""
+        cutoff = time.time() - hours * 3600
+        return [value for timestamp, value in list(self.metrics[metric_type]) if timestamp > cutoff]
+    
     def reset_alerts(self):
         """Reset all alerts"""
-        self.alerts = []
+        self.alerts.clear()
         logger.info("Health alerts reset")
 
 class HealthReporter:
@@ -398,7 +472,6 @@ class HealthReporter:
         """Generate daily health report"""
         try:
             status = self.health_monitor.get_health_status()
-            metrics_history = self.health_monitor.get_metrics_history(24)
             
             # Calculate statistics
             report = {
@@ -410,14 +483,15 @@ class HealthReporter:
                 'recommendations': []
             }
             
-            # Add metrics summary
-            for metric_type, history in metrics_history.items():
-                if history:
-                    values = [m['value'] for m in history]
+            # Add metrics summary; only the values are needed, so skip the
+            # timestamp formatting get_metrics_history does
+            for metric_type in _METRIC_TYPES:
+                values = self.health_monitor.get_metric_values(metric_type, 24)
+                if values:
                     report['metrics_summary'][metric_type] = {
                         'min': min(values),
                         'max': max(values),
-                        'average': sum(values) / len(values),
+                        'average': fmean(values),
                         'samples': len(values)
                     }
             
@@ -447,14 +521,15 @@ class HealthReporter:
             return report
             
         except Exception as e:
-            logger.error(f"Error generating daily report: {e}")
+            logger.error("Error generating daily report: %s", e)
             return {'error': str(e)}
     
     def export_report(self, report: Dict[str, Any], format: str = 'json') -> str:
         """Export report in specified format"""
         try:
             if format.lower() == 'json':
-                import json
+                if orjson is not None:
+                    return orjson.dumps(report, option=orjson.OPT_INDENT_2).decode()
                 return json.dumps(report, indent=2)
             
             elif format.lower() == 'csv':
@@ -483,5 +558,5 @@ class HealthReporter:
                 raise ValueError(f"Unsupported format: {format}")
                 
         except Exception as e:
-            logger.error(f"Error exporting report: {e}")
+            logger.error("Error exporting report: %s", e)
             return f"Error: {str(e)}" 
\ No newline at end of file
@@ -4,23 +4,42 @@ Automated Cat Feeder - Main Application
 Controls the entire system including weight sensing, feeding, and web interface
 """
 
+import os
 import time
+import sched
+import queue
 import threading
 import json
 import logging
 import logging.handlers
-from datetime import datetime, timedelta
+import psutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple
 
 from feeder_controller import FeederController
 from weight_sensor import WeightSensor
 from web_interface import WebInterface
 from database import Database
-from config_validator import validate_config_file
+from config_validator import parse_schedule_time, validate_config_file
 from health_monitor import HealthMonitor
 from backup_restore import BackupManager
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Configuration file, kept next to this module
+CONFIG_PATH: Path = Path(__file__).resolve().parent / 'config.json'
+
+# Wall clock step, in seconds, after which queued feedings are requeued
+_CLOCK_STEP_TOLERANCE = 1.0
+
+# Log record fields that need the calling frame looked up
+_CALLER_LOG_FIELDS = ('%(pathname)', '%(filename)', '%(module)', '%(funcName)', '%(lineno)')
+
 # Configure logging
 def setup_logging(config):
     """Setup logging configuration"""
@@ -31,6 +50,17 @@ def setup_logging(config):
     max_size = log_config.get('max_size_mb', 10) * 1024 * 1024  # Convert to bytes
     backup_count = log_config.get('backup_count', 5)
     
+    # Skip per-record work the format doesn't use; finding the caller walks
+    # the stack on every log call
+    if not any(field in log_format for field in _CALLER_LOG_FIELDS):
+        logging._srcfile = None
+    if '%(thread' not in log_format:
+        logging.logThreads = False
+    if '%(process)' not in log_format:
+        logging.logProcesses = False
+    if '%(processName)' not in log_format:
+        logging.logMultiprocessing = False
+    
     # Create formatter
     formatter = logging.Formatter(log_format)
     
@@ -52,6 +82,44 @@ def setup_logging(config):
 
 logger = logging.getLogger(__name__)
 
+def _set_thread_affinity(cpus: Set[int]) -> bool:
+    """Restrict the calling thread to the given CPUs, where the OS supports it"""
+    if not hasattr(os, 'sched_setaffinity'):
+        return False
+    try:
+        # On Linux, pid 0 applies to the calling thread only
+        os.sched_setaffinity(0, cpus)
+        return True
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning("Could not set CPU affinity to %s: %s", sorted(cpus), e)
+        return False
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    """
+    Write data to a file as indented JSON, using orjson when available
+    
+    The JSON goes to a temporary file that is synced and then renamed over
+    path, so a power cut leaves either the old or the new file, never a
+    partial one.
+    """
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2).encode('utf-8')
+    
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _dumps_json(data: Dict[str, Any]) -> bytes:
+    """Serialize data to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
 class CatFeeder:
     def __init__(self):
         """Initialize the cat feeder system"""
@@ -60,13 +128,16 @@ class CatFeeder:
         setup_logging(self.config)
         
         self.running = False
+        self._stop_event = threading.Event()
         
         # Initialize components
         self.database = Database()
         self.weight_sensor = WeightSensor(
             dout_pin=self.config['weight_sensor']['dout_pin'],
             sck_pin=self.config['weight_sensor']['sck_pin'],
-            calibration_factor=self.config['weight_sensor']['calibration_factor']
+            calibration_factor=self.config['weight_sensor']['calibration_factor'],
+            reading_samples=self.config['weight_sensor']['reading_samples'],
+            tare_samples=self.config['weight_sensor']['tare_samples']
         )
         self.feeder_controller = FeederController(
             servo_pin=self.config['servo']['pin'],
@@ -79,22 +150,94 @@ class CatFeeder:
         self.health_monitor = HealthMonitor(self.database, self.config)
         self.backup_manager = BackupManager(self.config)
         
-        # Feeding state
+        # Feeding state; the interval check uses the monotonic clock, which
+        # wall clock adjustments (e.g. NTP sync after boot) don't move
         self.last_feeding_time = None
+        self._last_feeding_mono_ns: Optional[int] = None
         self.current_weight = 0.0
         self.feeding_schedules = self.config['feeding_schedules']
         
+        # Weight polling: fast while the weight is changing or a cat is on
+        # the scale, slow while it's idle and steady
+        self._active_interval = 0.5  # seconds
+        self._idle_interval = 5.0  # seconds
+        self._weight_change_threshold = 0.02  # kg
+        self._refresh_cached_config()
+        
+        # The status (and so every status stream) is only refreshed when the
+        # weight moves by this much; the dashboard shows it to 10 g
+        self._status_weight_epsilon = 0.01  # kg
+        self._status_weight = 0.0
+        
+        # Weight polling, scheduled feedings and maintenance all run as timed
+        # events on one scheduler thread; setting _schedule_changed wakes the
+        # scheduler to re-check its queue. The queue runs on the monotonic
+        # clock so a wall clock step cannot stall polling or maintenance.
+        self._schedule_changed = threading.Event()
+        self.scheduler = sched.scheduler(time.monotonic, self._wait_for_schedule_change)
+        # Wall clock minus monotonic time when the feedings were queued; a
+        # change means the wall clock stepped and the feedings are requeued
+        self._clock_offset = time.time() - time.monotonic()
+        # Enabled schedules keyed by their minute of the day (hour * 60 + minute)
+        self._schedule_by_minute: Dict[int, List[Dict[str, Any]]] = {}
+        
         # Safety tracking
         self.daily_feeding_count = 0
         self.last_feeding_date = None
         
+        # Last scale reading, to tell whether the weight is changing
+        self._last_weight = None
+        
+        # Cat detection is logged when the cat arrives, then at most once per
+        # cat_detection_delay while it stays (monotonic times)
+        self._cat_present_since: Optional[float] = None
+        self._last_detection_log = 0.0
+        
+        # When the newest backup was made; read from the backup directory once,
+        # then kept up to date as backups are created
+        self._last_backup_time: Optional[datetime] = None
+        
+        # time.monotonic() deadline for the next daily database cleanup
+        self._next_cleanup = 0.0
+        
+        # Cleanups, backups and restarts run here, so a multi-minute backup
+        # never holds up weight polling or a feeding on the scheduler thread;
+        # created by start()
+        self._maintenance_executor: Optional[ThreadPoolExecutor] = None
+        
+        # CPUs the process may run on, before any thread is pinned
+        self._process_cpus: Set[int] = (os.sched_getaffinity(0)
+                                        if hasattr(os, 'sched_getaffinity') else set())
+        
+        # System boot time, for the uptime-based auto-restart
+        self._boot_time = psutil.boot_time()
+        
+        # Payload reused for every cat_detected event; log_event serializes
+        # it before returning, so it can be refilled for the next one. The
+        # detection time is stored as integer epoch nanoseconds.
+        self._cat_detected_data: Dict[str, Any] = {'weight': 0.0, 'timestamp_ns': 0}
+        
+        # Last status snapshot and its JSON, shared by get_status and
+        # get_status_json; rebuilt when _status_dirty is set by a state
+        # change or the health monitor has run a new check
+        self._status_snapshot: Optional[Tuple[Dict[str, Any], bytes]] = None
+        self._status_dirty = True
+        self._status_health_check: Optional[str] = None
+        
+        # Queues of status streams; the scheduler thread pushes the status
+        # JSON to each after a weight reading that changed it
+        self._status_subscribers: Set[queue.Queue] = set()
+        self._status_subscribers_lock = threading.Lock()
+        self._published_status: Optional[bytes] = None
+        
         logger.info("Cat Feeder initialized successfully")
     
     def load_config(self):
         """Load configuration from JSON file"""
-        config_path = Path(__file__).parent / 'config.json'
+        config_path = CONFIG_PATH
         if config_path.exists():
-            # Validate configuration
+            # Validate configuration; the result stays cached in memory until
+            # the file changes
             is_valid, config = validate_config_file(str(config_path))
             if not is_valid:
                 logger.error("Configuration validation failed, using defaults")
@@ -182,11 +325,13 @@ class CatFeeder:
                 'auto_restart_hours': 168,
                 'health_check_interval_minutes': 30,
                 'calibration_reminder_days': 30
+            },
+            'real_time': {
+                'pinned_cpu': 3
             }
         }
         # Save default config
-        with open(config_path, 'w') as f:
-            json.dump(default_config, f, indent=2)
+        _write_json(config_path, default_config)
         logger.info("Default configuration created")
         return default_config
     
@@ -197,33 +342,34 @@ class CatFeeder:
             return
         
         self.running = True
+        self._status_dirty = True
+        self._stop_event.clear()
         logger.info("Starting cat feeder system...")
         
         # Start health monitoring
         self.health_monitor.start()
         
-        # Start weight monitoring thread
-        weight_thread = threading.Thread(target=self.weight_monitoring_loop, daemon=True)
-        weight_thread.start()
+        # The worker starts from the scheduler thread, so it drops that
+        # thread's single-CPU affinity before backups start compressing
+        self._maintenance_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='maintenance',
+                                                        initializer=self._unpin_thread)
         
-        # Start feeding schedule thread
-        schedule_thread = threading.Thread(target=self.feeding_schedule_loop, daemon=True)
-        schedule_thread.start()
-        
-        # Start maintenance thread
-        maintenance_thread = threading.Thread(target=self.maintenance_loop, daemon=True)
-        maintenance_thread.start()
+        # Start the scheduler thread with weight monitoring and maintenance;
+        # it queues the feeding schedules itself
+        self.scheduler.enter(0, 2, self._poll_weight)
+        self.scheduler.enter(0, 3, self._run_maintenance)
+        scheduler_thread = threading.Thread(target=self.scheduler_loop, daemon=True)
+        scheduler_thread.start()
         
         # Start web interface
-        web_thread = threading.Thread(target=self.web_interface.start, daemon=True)
+        web_thread = threading.Thread(target=self._run_web_interface, daemon=True)
         web_thread.start()
         
         logger.info("Cat feeder system started successfully")
         
         try:
             # Main loop
-            while self.running:
-                time.sleep(1)
+            self._stop_event.wait()
         except KeyboardInterrupt:
             logger.info("Shutdown signal received")
             self.stop()
@@ -232,93 +378,275 @@ class CatFeeder:
         """Stop the cat feeder system"""
         logger.info("Stopping cat feeder system...")
         self.running = False
+        self._status_dirty = True
+        self._stop_event.set()
+        self._cancel_events()
+        self._schedule_changed.set()
         
         # Stop health monitoring
         self.health_monitor.stop()
         
+        # Drop queued maintenance; a backup already running is not waited for
+        if self._maintenance_executor is not None:
+            self._maintenance_executor.shutdown(wait=False, cancel_futures=True)
+        
         # Cleanup components
         self.feeder_controller.cleanup()
         self.web_interface.stop()
+        self.database.close()
         
         logger.info("Cat feeder system stopped")
     
-    def weight_monitoring_loop(self):
-        """Continuous weight monitoring loop"""
-        while self.running:
-            try:
-                weight = self.weight_sensor.get_weight()
-                if weight is not None:
-                    self.current_weight = weight
-                    
-                    # Check if cat is present
-                    if self.is_cat_present():
-                        logger.info(f"Cat detected - Weight: {weight:.2f}kg")
-                        self.handle_cat_detection()
-                
-                time.sleep(0.5)  # Update every 500ms
+    def _poll_weight(self):
+        """Read the scale, then queue the next reading"""
+        interval = self._idle_interval
+        try:
+            weight = self.weight_sensor.get_weight()
+            if weight is not None:
+                last_weight = self._last_weight
+                if last_weight is None or abs(weight - last_weight) >= self._weight_change_threshold:
+                    interval = self._active_interval
+                self._last_weight = weight
+                self.current_weight = weight
+                if abs(weight - self._status_weight) >= self._status_weight_epsilon:
+                    self._status_weight = weight
+                    self._status_dirty = True
                 
-            except Exception as e:
-                logger.error(f"Error in weight monitoring: {e}")
-                time.sleep(1)
+                # Check if cat is present; the is_cat_present test, inlined
+                # on the reading already in hand
+                if (weight > self._tare_threshold and
+                        self._min_cat_weight <= weight <= self._max_cat_weight):
+                    now = time.monotonic()
+                    present_since = self._cat_present_since
+                    if (present_since is None or
+                            now - self._last_detection_log >= self._cat_detection_delay):
+                        if present_since is None:
+                            self._cat_present_since = now
+                            self._status_dirty = True
+                        self._last_detection_log = now
+                        logger.info("Cat detected - Weight: %.2fkg", weight)
+                        self.handle_cat_detection()
+                    interval = self._active_interval
+                elif self._cat_present_since is not None:
+                    self._cat_present_since = None
+                    self._status_dirty = True
+        
+        except Exception as e:
+            logger.error("Error in weight monitoring: %s", e)
+            interval = 1.0
+        
+        finally:
+            if self._status_subscribers:
+                self._publish_status()
+            if self.running:
+                self._check_clock_step()
+                self.scheduler.enter(interval, 2, self._poll_weight)
+    
+    def _check_clock_step(self):
+        """Requeue the feedings if the wall clock has stepped since they were queued"""
+        step = (time.time() - time.monotonic()) - self._clock_offset
+        if abs(step) >= _CLOCK_STEP_TOLERANCE:
+            logger.warning("Wall clock stepped by %.0fs, rescheduling feedings", step)
+            self._schedule_feedings(self._schedule_by_minute)
+    
+    def _pinned_cpu(self) -> Optional[int]:
+        """Get the CPU reserved for the scheduler thread, if a valid one is configured"""
+        pinned_cpu = self.config.get('real_time', {}).get('pinned_cpu')
+        # The validator only warns about a bad value, so ignore it here
+        if type(pinned_cpu) is int and pinned_cpu >= 0:
+            return pinned_cpu
+        return None
     
-    def feeding_schedule_loop(self):
-        """Check feeding schedules and trigger feedings"""
+    def _unpin_thread(self):
+        """Move the calling thread, and threads it starts, off the scheduler's CPU"""
+        pinned_cpu = self._pinned_cpu()
+        if pinned_cpu is not None:
+            other_cpus = self._process_cpus - {pinned_cpu}
+            if other_cpus:
+                _set_thread_affinity(other_cpus)
+    
+    def _run_web_interface(self):
+        """Run the web interface on the CPUs not reserved for the scheduler"""
+        # Request threads inherit this thread's affinity
+        self._unpin_thread()
+        self.web_interface.start()
+    
+    def scheduler_loop(self):
+        """Run weight monitoring, scheduled feedings and maintenance"""
+        # Keep HX711 sampling off the cores busy with web requests and GC
+        pinned_cpu = self._pinned_cpu()
+        if pinned_cpu is not None and _set_thread_affinity({pinned_cpu}):
+            logger.info("Scheduler thread pinned to CPU %s", pinned_cpu)
+        
+        self._schedule_feedings()
+        
         while self.running:
             try:
-                current_time = datetime.now().strftime('%H:%M')
-                
-                for schedule in self.feeding_schedules:
-                    if (schedule['enabled'] and 
-                        schedule['time'] == current_time and
-                        self.should_feed()):
-                        
-                        logger.info(f"Triggering scheduled feeding at {current_time}")
-                        self.feed_cat(schedule['portion'])
-                
-                time.sleep(30)  # Check every 30 seconds
-                
+                # Runs until nothing is scheduled, then waits for a change
+                self.scheduler.run()
+                if self.running:
+                    self._schedule_changed.wait()
+                    self._schedule_changed.clear()
+            
             except Exception as e:
-                logger.error(f"Error in feeding schedule: {e}")
+                logger.error("Error in scheduler: %s", e)
                 time.sleep(60)
     
+    def _wait_for_schedule_change(self, timeout: float):
+        """Scheduler delay function; returns early when schedules change"""
+        if self._schedule_changed.wait(timeout):
+            self._schedule_changed.clear()
+    
+    @staticmethod
+    def _group_schedules(schedules: Any) -> Tuple[Dict[int, List[Dict[str, Any]]], List[str]]:
+        """
+        Group the enabled feeding schedules by their minute of the day
+        
+        Args:
+            schedules: Feeding schedules list from the config
+            
+        Returns:
+            Tuple of (enabled schedules keyed by hour * 60 + minute,
+            problems with the entries that were left out)
+        """
+        schedule_by_minute: Dict[int, List[Dict[str, Any]]] = {}
+        problems: List[str] = []
+        if not isinstance(schedules, list):
+            return schedule_by_minute, ["feeding_schedules must be a list"]
+        
+        for i, schedule in enumerate(schedules):
+            if not isinstance(schedule, dict):
+                problems.append("Schedule %d must be a dictionary" % i)
+                continue
+            
+            minute_of_day = parse_schedule_time(schedule.get('time'))
+            portion = schedule.get('portion')
+            if minute_of_day is None:
+                problems.append("Invalid time format in schedule %d: %s" % (i, schedule.get('time')))
+            elif type(portion) not in (int, float) or portion <= 0:
+                problems.append("Invalid portion in schedule %d: %s" % (i, portion))
+            elif schedule.get('enabled'):
+                schedule_by_minute.setdefault(minute_of_day, []).append(schedule)
+        
+        return schedule_by_minute, problems
+    
+    @staticmethod
+    def _next_feeding_time(minute_of_day: int) -> float:
+        """Get the epoch time of the next occurrence of a minute of the day"""
+        now = datetime.now()
+        hour, minute = divmod(minute_of_day, 60)
+        next_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if next_time <= now:
+            next_time += timedelta(days=1)
+        return next_time.timestamp()
+    
+    def _schedule_feeding(self, minute_of_day: int):
+        """Queue the next feeding time at minute_of_day"""
+        delay = self._next_feeding_time(minute_of_day) - time.time()
+        self.scheduler.enter(delay, 1, self._run_scheduled_feeding, (minute_of_day,))
+    
+    def _cancel_events(self, action=None):
+        """Remove queued scheduler events, only those calling action if given"""
+        for event in self.scheduler.queue:
+            if action is None or event.action == action:
+                try:
+                    self.scheduler.cancel(event)
+                except ValueError:
+                    pass  # Already ran
+    
+    def _schedule_feedings(self, schedule_by_minute: Optional[Dict[int, List[Dict[str, Any]]]] = None):
+        """
+        Replace the queued feedings with the current feeding schedules
+        
+        Args:
+            schedule_by_minute: feeding_schedules already grouped by
+                _group_schedules; grouped here if None, skipping bad entries
+        """
+        if schedule_by_minute is None:
+            schedule_by_minute, problems = self._group_schedules(self.feeding_schedules)
+            for problem in problems:
+                logger.error("Skipping feeding schedule: %s", problem)
+        
+        self._cancel_events(self._run_scheduled_feeding)
+        self._schedule_by_minute = schedule_by_minute
+        self._clock_offset = time.time() - time.monotonic()
+        
+        # One event per feeding time covers every schedule at that minute,
+        # and is re-queued for the same minute each day
+        if self.running:
+            for minute_of_day in schedule_by_minute:
+                self._schedule_feeding(minute_of_day)
+        self._schedule_changed.set()
+    
+    def _run_scheduled_feeding(self, minute_of_day: int):
+        """Trigger the feedings scheduled at minute_of_day and queue the next day's"""
+        schedules = self._schedule_by_minute.get(minute_of_day, ())
+        try:
+            # Feeding delays are taken from the wall clock when queued; if it
+            # steps (e.g. NTP syncing a Pi without an RTC) before the next
+            # weight poll requeues them, only feed at the intended minute
+            now = datetime.now()
+            if now.hour * 60 + now.minute != minute_of_day:
+                logger.warning("Skipping feeding due at %02d:%02d, clock reads %s",
+                               minute_of_day // 60, minute_of_day % 60, now.strftime('%H:%M'))
+                return
+            
+            for schedule in schedules:
+                if self.should_feed():
+                    logger.info("Triggering scheduled feeding at %s", schedule['time'])
+                    self.feed_cat(schedule['portion'])
+        except Exception as e:
+            logger.error("Error in feeding schedule: %s", e)
+        finally:
+            # Skip times that were rescheduled while this one was running
+            if self.running and self._schedule_by_minute.get(minute_of_day) is schedules:
+                self._schedule_feeding(minute_of_day)
+    
+    def _refresh_cached_config(self):
+        """Cache the cat detection thresholds and safety limits from the config"""
+        thresholds = self.config['weight_thresholds']
+        self._min_cat_weight = thresholds['min_cat_weight']
+        self._max_cat_weight = thresholds['max_cat_weight']
+        self._tare_threshold = thresholds['tare_threshold']
+        self._cat_detection_delay = thresholds.get('cat_detection_delay', 2.0)
+        
+        safety = self.config['safety']
+        self._max_daily_feedings = safety['max_daily_feedings']
+        self._min_feeding_interval_ns = int(safety['min_feeding_interval_minutes'] * 60 * 10**9)
+        self._max_portion_grams = safety['max_portion_grams']
+    
     def is_cat_present(self):
         """Check if a cat is present on the scale"""
-        min_weight = self.config['weight_thresholds']['min_cat_weight']
-        max_weight = self.config['weight_thresholds']['max_cat_weight']
-        tare_threshold = self.config['weight_thresholds']['tare_threshold']
-        
-        return (self.current_weight > tare_threshold and 
-                min_weight <= self.current_weight <= max_weight)
+        weight = self.current_weight
+        return (weight > self._tare_threshold and
+                self._min_cat_weight <= weight <= self._max_cat_weight)
     
     def should_feed(self):
         """Determine if feeding should occur based on time since last feeding"""
-        if self.last_feeding_time is None:
+        if self._last_feeding_mono_ns is None:
             return True
         
         # Check daily feeding limit
-        current_date = datetime.now().date()
+        current_date = date.today()
         if self.last_feeding_date != current_date:
             self.daily_feeding_count = 0
             self.last_feeding_date = current_date
+            self._status_dirty = True
         
-        max_daily = self.config['safety']['max_daily_feedings']
-        if self.daily_feeding_count >= max_daily:
-            logger.warning(f"Daily feeding limit reached ({max_daily})")
+        if self.daily_feeding_count >= self._max_daily_feedings:
+            logger.warning("Daily feeding limit reached (%s)", self._max_daily_feedings)
             return False
         
         # Check minimum interval
-        min_interval = timedelta(minutes=self.config['safety']['min_feeding_interval_minutes'])
-        time_since_last = datetime.now() - self.last_feeding_time
-        
-        return time_since_last >= min_interval
+        return time.monotonic_ns() - self._last_feeding_mono_ns >= self._min_feeding_interval_ns
     
     def handle_cat_detection(self):
         """Handle cat detection events"""
         # Log cat detection
-        self.database.log_event('cat_detected', {
-            'weight': self.current_weight,
-            'timestamp': datetime.now().isoformat()
-        })
+        data = self._cat_detected_data
+        data['weight'] = self.current_weight
+        data['timestamp_ns'] = time.time_ns()
+        self.database.log_event('cat_detected', data)
         
         # Could trigger automatic feeding based on weight
         # or other criteria here
@@ -327,19 +655,21 @@ class CatFeeder:
         """Feed the cat with specified portion"""
         try:
             # Validate portion size
-            max_portion = self.config['safety']['max_portion_grams']
+            max_portion = self._max_portion_grams
             if portion_grams > max_portion:
-                logger.error(f"Portion size {portion_grams}g exceeds maximum {max_portion}g")
+                logger.error("Portion size %sg exceeds maximum %sg", portion_grams, max_portion)
                 return False
             
-            logger.info(f"Feeding cat {portion_grams}g of food")
+            logger.info("Feeding cat %sg of food", portion_grams)
             
             # Dispense food
             success = self.feeder_controller.dispense_food(portion_grams)
             
             if success:
                 self.last_feeding_time = datetime.now()
+                self._last_feeding_mono_ns = time.monotonic_ns()
                 self.daily_feeding_count += 1
+                self._status_dirty = True
                 
                 # Log feeding event
                 self.database.log_event('feeding', {
@@ -349,18 +679,79 @@ class CatFeeder:
                     'daily_count': self.daily_feeding_count
                 })
                 
-                logger.info(f"Successfully fed {portion_grams}g of food (daily count: {self.daily_feeding_count})")
+                logger.info("Successfully fed %sg of food (daily count: %s)", portion_grams, self.daily_feeding_count)
                 return True
             else:
                 logger.error("Failed to dispense food")
                 return False
                 
         except Exception as e:
-            logger.error(f"Error during feeding: {e}")
+            logger.error("Error during feeding: %s", e)
             return False
     
     def get_status(self):
         """Get current system status"""
+        # Web requests are served from several threads, so callers get their
+        # own shallow copy rather than the shared snapshot
+        return dict(self._current_status()[0])
+    
+    def get_status_json(self) -> bytes:
+        """Get current system status serialized as JSON"""
+        return self._current_status()[1]
+    
+    def subscribe_status(self) -> queue.Queue:
+        """
+        Subscribe to status changes
+        
+        Returns:
+            Queue holding the latest status JSON not yet taken; older
+            updates a slow reader missed are dropped
+        """
+        updates = queue.Queue(maxsize=1)
+        with self._status_subscribers_lock:
+            self._status_subscribers.add(updates)
+        return updates
+    
+    def unsubscribe_status(self, updates: queue.Queue):
+        """Stop pushing status changes to a queue from subscribe_status"""
+        with self._status_subscribers_lock:
+            self._status_subscribers.discard(updates)
+    
+    def _publish_status(self):
+        """Push the status JSON to every subscriber if it changed since the last push"""
+        body = self._current_status()[1]
+        if body is self._published_status:
+            return
+        self._published_status = body
+        
+        with self._status_subscribers_lock:
+            subscribers = list(self._status_subscribers)
+        for updates in subscribers:
+            try:
+                updates.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                updates.put_nowait(body)
+            except queue.Full:
+                pass
+    
+    def _current_status(self) -> Tuple[Dict[str, Any], bytes]:
+        """Get the status snapshot and its JSON, rebuilding them if anything changed"""
+        last_check = self.health_monitor.metrics['last_check']
+        snapshot = self._status_snapshot
+        if snapshot is None or self._status_dirty or last_check != self._status_health_check:
+            # Clear the flag before reading state, so a change made while
+            # the status is being built marks it stale again
+            self._status_dirty = False
+            self._status_health_check = last_check
+            status = self._build_status()
+            snapshot = (status, _dumps_json(status))
+            self._status_snapshot = snapshot
+        return snapshot
+    
+    def _build_status(self) -> Dict[str, Any]:
+        """Read the current system status into a new dict"""
         return {
             'running': self.running,
             'current_weight': self.current_weight,
@@ -372,58 +763,98 @@ class CatFeeder:
         }
     
     def update_config(self, new_config):
-        """Update system configuration"""
+        """
+        Update system configuration
+        
+        Raises:
+            ValueError: If new feeding schedules are invalid; nothing is
+                changed in that case
+        """
+        # Check new schedules before touching the config or the queued feedings
+        schedule_by_minute = None
+        if 'feeding_schedules' in new_config:
+            schedule_by_minute, problems = self._group_schedules(new_config['feeding_schedules'])
+            if problems:
+                raise ValueError('; '.join(problems))
+        
         self.config.update(new_config)
+        self.backup_manager.update_config(self.config)
+        self._status_dirty = True
+        
+        if 'feeding_schedules' in new_config:
+            self.feeding_schedules = self.config['feeding_schedules']
+            self._schedule_feedings(schedule_by_minute)
+        
+        if 'weight_thresholds' in new_config or 'safety' in new_config:
+            self._refresh_cached_config()
+        
+        if 'maintenance' in new_config:
+            self.health_monitor.update_interval()
         
         # Save to file
-        config_path = Path(__file__).parent / 'config.json'
-        with open(config_path, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        _write_json(CONFIG_PATH, self.config)
         
         logger.info("Configuration updated")
     
-    def maintenance_loop(self):
-        """Maintenance tasks loop"""
-        while self.running:
-            try:
-                # Database cleanup
-                self.database.cleanup_old_data(self.config['database']['cleanup_days'])
-                
-                # Create backup if needed
-                self._check_backup_schedule()
-                
-                # Check for auto-restart
-                self._check_auto_restart()
-                
-                # Sleep for maintenance interval
-                time.sleep(3600)  # Check every hour
-                
-            except Exception as e:
-                logger.error(f"Error in maintenance loop: {e}")
-                time.sleep(3600)
+    def _run_maintenance(self):
+        """Hand due maintenance tasks to the maintenance thread, then queue the next check"""
+        try:
+            executor = self._maintenance_executor
+            
+            # Database cleanup, once a day
+            now = time.monotonic()
+            if now >= self._next_cleanup:
+                self._next_cleanup = now + 86400
+                executor.submit(self._cleanup_database)
+            
+            # Create backup if needed; finding the last backup reads the
+            # backup directory, so the whole check runs off this thread
+            executor.submit(self._check_backup_schedule)
+            
+            # Check for auto-restart
+            self._check_auto_restart()
+        
+        except Exception as e:
+            logger.error("Error in maintenance: %s", e)
+        
+        finally:
+            if self.running:
+                self.scheduler.enter(3600, 3, self._run_maintenance)  # Check every hour
+    
+    def _cleanup_database(self):
+        """Delete old database rows"""
+        try:
+            self.database.cleanup_old_data(self.config['database']['cleanup_days'])
+        except Exception as e:
+            logger.error("Error cleaning up database: %s", e)
     
     def _check_backup_schedule(self):
         """Check if backup is due"""
         try:
             backup_interval = self.config['database']['backup_interval_hours']
-            last_backup_file = self.backup_manager.list_backups()
             
-            if not last_backup_file:
-                # No backups exist, create one
-                self.backup_manager.create_backup()
-                return
+            if self._last_backup_time is None:
+                last_backup_file = self.backup_manager.list_backups()
+                
+                if not last_backup_file:
+                    # No backups exist, create one
+                    self.backup_manager.create_backup()
+                    self._last_backup_time = datetime.now()
+                    return
+                
+                last_backup = last_backup_file[0]  # Most recent
+                self._last_backup_time = datetime.fromisoformat(last_backup['created'])
             
             # Check if enough time has passed since last backup
-            last_backup = last_backup_file[0]  # Most recent
-            last_backup_time = datetime.fromisoformat(last_backup['created'])
-            time_since_backup = datetime.now() - last_backup_time
+            time_since_backup = datetime.now() - self._last_backup_time
             
             if time_since_backup.total_seconds() >= backup_interval * 3600:
                 self.backup_manager.create_backup()
+                self._last_backup_time = datetime.now()
                 logger.info("Scheduled backup created")
                 
         except Exception as e:
-            logger.error(f"Error checking backup schedule: {e}")
+            logger.error("Error checking backup schedule: %s", e)
     
     def _check_auto_restart(self):
         """Check if auto-restart is needed"""
@@ -433,16 +864,15 @@ class CatFeeder:
                 return
             
             # Get system uptime
-            import psutil
-            uptime_seconds = time.time() - psutil.boot_time()
+            uptime_seconds = time.time() - self._boot_time
             uptime_hours = uptime_seconds / 3600
             
             if uptime_hours >= auto_restart_hours:
-                logger.info(f"Auto-restart triggered after {uptime_hours:.1f} hours")
-                self._schedule_restart()
+                logger.info("Auto-restart triggered after %.1f hours", uptime_hours)
+                self._maintenance_executor.submit(self._schedule_restart)
                 
         except Exception as e:
-            logger.error(f"Error checking auto-restart: {e}")
+            logger.error("Error checking auto-restart: %s", e)
     
     def _schedule_restart(self):
         """Schedule system restart"""
@@ -459,16 +889,17 @@ class CatFeeder:
             })
             
         except Exception as e:
-            logger.error(f"Failed to schedule restart: {e}")
+            logger.error("Failed to schedule restart: %s", e)
     
     def create_backup(self, include_logs: bool = True, include_database: bool = True) -> str:
         """Create a backup of the system"""
         try:
             backup_path = self.backup_manager.create_backup(include_logs, include_database)
-            logger.info(f"Manual backup created: {backup_path}")
+            self._last_backup_time = datetime.now()
+            logger.info("Manual backup created: %s", backup_path)
             return backup_path
         except Exception as e:
-            logger.error(f"Failed to create backup: {e}")
+            logger.error("Failed to create backup: %s", e)
             raise
     
     def get_backup_list(self) -> List[Dict[str, Any]]:
@@ -479,13 +910,21 @@ class CatFeeder:
                       restore_config: bool = True, restore_logs: bool = False) -> bool:
         """Restore from backup"""
         try:
-            success = self.backup_manager.restore_backup(backup_path, restore_database, 
-                                                        restore_config, restore_logs)
+            # The restored database file replaces the open one and its WAL,
+            # so both connections are closed for the swap
+            if restore_database:
+                self.database.close()
+            try:
+                success = self.backup_manager.restore_backup(backup_path, restore_database, 
+                                                            restore_config, restore_logs)
+            finally:
+                if restore_database:
+                    self.database.reopen()
             if success:
-                logger.info(f"Backup restored successfully: {backup_path}")
+                logger.info("Backup restored successfully: %s", backup_path)
             return success
         except Exception as e:
-            logger.error(f"Failed to restore backup: {e}")
+            logger.error("Failed to restore backup: %s", e)
             return False
 
 def main():
@@ -5,166 +5,74 @@ Flask-based web server for controlling and monitoring the cat feeder
 """
 
 import json
+import gzip
+import time
+import uuid
+import queue
+import hashlib
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
-from flask import Flask, render_template, request, jsonify, redirect, url_for
-from flask_sqlalchemy import SQLAlchemy
+from typing import Dict, Any, Callable, Hashable, List, Tuple
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import DictLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import waitress
+except ImportError:
+    # Fall back to the Werkzeug development server
+    waitress = None
 
 logger = logging.getLogger(__name__)
 
-class WebInterface:
-    def __init__(self, cat_feeder):
-        """Initialize web interface"""
-        self.cat_feeder = cat_feeder
-        self.app = Flask(__name__)
-        self.app.config['SECRET_KEY'] = 'cat-feeder-secret-key'
-        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///cat_feeder.db'
-        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-        
-        self.db = SQLAlchemy(self.app)
-        self._setup_routes()
-        self._setup_templates()
-    
-    def _setup_routes(self):
-        """Setup Flask routes"""
-        
-        @self.app.route('/')
-        def index():
-            """Main dashboard"""
-            status = self.cat_feeder.get_status()
-            recent_events = self.cat_feeder.database.get_recent_events(10)
-            return render_template('index.html', status=status, events=recent_events)
-        
-        @self.app.route('/api/status')
-        def api_status():
-            """Get system status as JSON"""
-            return jsonify(self.cat_feeder.get_status())
-        
-        @self.route('/api/feed', methods=['POST'])
-        def api_feed():
-            """Trigger manual feeding"""
-            try:
-                data = request.get_json()
-                portion = data.get('portion', 50)  # Default 50g
-                
-                success = self.cat_feeder.feed_cat(portion)
-                return jsonify({'success': success})
-            except Exception as e:
-                logger.error(f"Error in manual feeding: {e}")
-                return jsonify({'success': False, 'error': str(e)})
-        
-        @self.app.route('/api/feed_manual', methods=['POST'])
-        def api_feed_manual():
-            """Manual feeding with duration"""
-            try:
-                data = request.get_json()
-                duration = data.get('duration', 2.0)  # Default 2 seconds
-                
-                success = self.cat_feeder.feeder_controller.dispense_food_manual(duration)
-                return jsonify({'success': success})
-            except Exception as e:
-                logger.error(f"Error in manual feeding: {e}")
-                return jsonify({'success': False, 'error': str(e)})
-        
-        @self.app.route('/api/tare', methods=['POST'])
-        def api_tare():
-            """Tare the weight sensor"""
-            try:
-                success = self.cat_feeder.weight_sensor.tare()
-                return jsonify({'success': success})
-            except Exception as e:
-                logger.error(f"Error taring scale: {e}")
-                return jsonify({'success': False, 'error': str(e)})
-        
-        @self.app.route('/api/calibrate', methods=['POST'])
-        def api_calibrate():
-            """Calibrate weight sensor"""
-            try:
-                data = request.get_json()
-                known_weight = data.get('known_weight')
-                
-                if not known_weight:
-                    return jsonify({'success': False, 'error': 'Known weight required'})
-                
-                success = self.cat_feeder.weight_sensor.calibrate(known_weight)
-                return jsonify({'success': success})
-            except Exception as e:
-                logger.error(f"Error calibrating: {e}")
-                return jsonify({'success': False, 'error': str(e)})
-        
-        @self.app.route('/api/schedules', methods=['GET', 'POST'])
-        def api_schedules():
-            """Get or update feeding schedules"""
-            if request.method == 'GET':
-                return jsonify(self.cat_feeder.feeding_schedules)
-            else:
-                try:
-                    data = request.get_json()
-                    self.cat_feeder.feeding_schedules = data
-                    self.cat_feeder.update_config({'feeding_schedules': data})
-                    return jsonify({'success': True})
-                except Exception as e:
-                    logger.error(f"Error updating schedules: {e}")
-                    return jsonify({'success': False, 'error': str(e)})
-        
-        @self.app.route('/api/events')
-        def api_events():
-            """Get recent events"""
-            try:
-                limit = request.args.get('limit', 50, type=int)
-                events = self.cat_feeder.database.get_recent_events(limit)
-                return jsonify(events)
-            except Exception as e:
-                logger.error(f"Error getting events: {e}")
-                return jsonify({'error': str(e)})
-        
-        @self.app.route('/api/config', methods=['GET', 'POST'])
-        def api_config():
-            """Get or update configuration"""
-            if request.method == 'GET':
-                return jsonify(self.cat_feeder.config)
-            else:
-                try:
-                    data = request.get_json()
-                    self.cat_feeder.update_config(data)
-                    return jsonify({'success': True})
-                except Exception as e:
-                    logger.error(f"Error updating config: {e}")
-                    return jsonify({'success': False, 'error': str(e)})
-        
-        @self.app.route('/api/weight_history')
-        def api_weight_history():
-            """Get weight history data"""
-            try:
-                hours = request.args.get('hours', 24, type=int)
-                events = self.cat_feeder.database.get_weight_history(hours)
-                return jsonify(events)
-            except Exception as e:
-                logger.error(f"Error getting weight history: {e}")
-                return jsonify({'error': str(e)})
-        
-        @self.app.route('/api/feeding_history')
-        def api_feeding_history():
-            """Get feeding history data"""
-            try:
-                days = request.args.get('days', 7, type=int)
-                events = self.cat_feeder.database.get_feeding_history(days)
-                return jsonify(events)
-            except Exception as e:
-                logger.error(f"Error getting feeding history: {e}")
-                return jsonify({'error': str(e)})
-    
-    def _setup_templates(self):
-        """Setup HTML templates"""
-        
-        # Create templates directory
-        import os
-        templates_dir = os.path.join(os.path.dirname(__file__), 'templates')
-        os.makedirs(templates_dir, exist_ok=True)
-        
-        # Create base template
-        base_template = '''<!DOCTYPE html>
+# Request worker threads for the waitress server; it handles slow client
+# sockets itself, so workers are only busy while a view runs
+WEB_THREADS = 4
+
+# Each /api/stream client holds a worker thread for as long as it stays
+# connected, so only this many are served; others fall back to polling
+MAX_STATUS_STREAMS = WEB_THREADS // 2
+# Seconds between keep-alive comments on an idle status stream
+STREAM_KEEPALIVE = 15.0
+
+# Seconds a GET response body is reused for, per endpoint; feedings and
+# config changes made through the API clear the cache straight away
+_RESPONSE_TTL = {
+    'events': 5.0,
+    'weight_history': 30.0,
+    'feeding_history': 30.0,
+}
+_RESPONSE_CACHE_MAX = 64
+
+# Recent events listed on the dashboard
+DASHBOARD_EVENTS = 10
+
+# Default bucket width for /api/weight_history
+WEIGHT_BUCKET_SECONDS = 300
+
+# Finished tare/calibrate tasks kept for /api/task polling
+SENSOR_TASKS_MAX = 16
+
+# Upper bounds for history query arguments, so one request cannot ask the
+# database for an unbounded number of rows
+MAX_EVENTS_LIMIT = 500
+MAX_HISTORY_HOURS = 168
+MAX_HISTORY_DAYS = 90
+
+# JSON responses at least this many bytes are gzipped for clients that
+# accept it; smaller ones gain less than the compression costs
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_LEVEL = 6
+
+# Dashboard page templates, served from memory by a DictLoader
+_BASE_TEMPLATE = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -203,9 +111,8 @@ class WebInterface:
     {% block scripts %}{% endblock %}
 </body>
 </html>'''
-        
-        # Create index template
-        index_template = '''{% extends "base.html" %}
+
+_INDEX_TEMPLATE = '''{% extends "base.html" %}
 
 {% block title %}Dashboard - Cat Feeder{% endblock %}
 
@@ -360,24 +267,99 @@ class WebInterface:
 
 {% block scripts %}
 <script>
-// Update status every 2 seconds
-setInterval(updateStatus, 2000);
+// Feeding schedules as of the last update
+let feedingSchedules = {{ status.feeding_schedules|tojson }};
+
+// The server pushes status changes over /api/stream; without EventSource,
+// or when the server has no stream to spare, poll every 2 seconds instead
+let pollTimer = null;
+
+function startPolling() {
+    if (pollTimer === null) {
+        pollTimer = setInterval(updateStatus, 2000);
+    }
+}
+
+if (window.EventSource) {
+    // New events come with a feeding or a cat arriving or leaving, so the
+    // list is only refetched when one of those shows in the status
+    let eventsKey = null;
+    const statusStream = new EventSource('/api/stream');
+    statusStream.onmessage = event => {
+        const status = JSON.parse(event.data);
+        renderStatus(status);
+        const key = [status.daily_feeding_count, status.last_feeding_time, status.cat_present].join('|');
+        if (key !== eventsKey) {
+            eventsKey = key;
+            updateEvents();
+        }
+    };
+    statusStream.onerror = () => {
+        // EventSource reconnects by itself unless the server refused it
+        if (statusStream.readyState === EventSource.CLOSED) {
+            startPolling();
+        }
+    };
+} else {
+    startPolling();
+}
 
 function updateStatus() {
-    fetch('/api/status')
+    fetch('/api/dashboard')
         .then(response => response.json())
-        .then(data => {
-            document.getElementById('current-weight').textContent = data.current_weight.toFixed(2) + ' kg';
-            document.getElementById('weight-status').innerHTML = data.cat_present ? 
-                '<span class="text-success"><i class="fas fa-cat"></i> Cat Detected</span>' :
-                '<span class="text-muted">No cat present</span>';
-            document.getElementById('system-status').innerHTML = data.running ?
-                '<span class="text-success">Running</span>' :
-                '<span class="text-danger">Stopped</span>';
+        .then(dashboard => {
+            renderStatus(dashboard.status);
+            renderEvents(dashboard.events);
         })
         .catch(error => console.error('Error updating status:', error));
 }
 
+function updateEvents() {
+    fetch('/api/events?limit={{ dashboard_events }}')
+        .then(response => response.json())
+        .then(renderEvents)
+        .catch(error => console.error('Error updating events:', error));
+}
+
+function renderStatus(data) {
+    feedingSchedules = data.feeding_schedules;
+    document.getElementById('current-weight').textContent = data.current_weight.toFixed(2) + ' kg';
+    document.getElementById('weight-status').innerHTML = data.cat_present ? 
+        '<span class="text-success"><i class="fas fa-cat"></i> Cat Detected</span>' :
+        '<span class="text-muted">No cat present</span>';
+    document.getElementById('system-status').innerHTML = data.running ?
+        '<span class="text-success">Running</span>' :
+        '<span class="text-danger">Stopped</span>';
+    document.getElementById('last-feeding').textContent = data.last_feeding_time ?
+        data.last_feeding_time.split('T')[1].slice(0, 5) : 'Never';
+}
+
+function renderEvents(events) {
+    document.getElementById('events-list').innerHTML = events.map(renderEvent).join('');
+}
+
+function renderEvent(event) {
+    // Same markup as the server-rendered list; the type is title-cased like
+    // Python's str.title()
+    const title = event.type.toLowerCase().replace(/(^|[^a-z])([a-z])/g, (m, p, c) => p + c.toUpperCase());
+    let details = '';
+    if (event.data) {
+        if (event.data.portion) {
+            details += ` - ${event.data.portion}g`;
+        }
+        if (event.data.weight) {
+            details += ` - ${event.data.weight.toFixed(2)}kg`;
+        }
+    }
+    return `<div class="d-flex justify-content-between align-items-center py-2 border-bottom">
+        <div>
+            <i class="fas fa-${event.type === 'feeding' ? 'utensils' : 'cat'} me-2"></i>
+            <strong>${title}</strong>${details}
+        </div>
+        <small class="text-muted">${event.timestamp.split('T')[1].slice(0, 5)}</small>
+    </div>`;
+}
+
 function feedCat(portion) {
     fetch('/api/feed', {
         method: 'POST',
@@ -399,9 +381,19 @@ function feedCat(portion) {
     });
 }
 
+function waitForTask(taskId) {
+    // Resolves with the finished task's result
+    return fetch('/api/task/' + taskId)
+        .then(response => response.json())
+        .then(data => data.done === false
+            ? new Promise(resolve => setTimeout(resolve, 500)).then(() => waitForTask(taskId))
+            : data);
+}
+
 function tareScale() {
     fetch('/api/tare', {method: 'POST'})
     .then(response => response.json())
+    .then(data => data.task_id ? waitForTask(data.task_id) : data)
     .then(data => {
         if (data.success) {
             showAlert('Scale tared successfully!', 'success');
@@ -417,15 +409,13 @@ function tareScale() {
 }
 
 function toggleSchedule(index, enabled) {
-    fetch('/api/schedules')
-    .then(response => response.json())
-    .then(schedules => {
-        schedules[index].enabled = enabled;
-        return fetch('/api/schedules', {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify(schedules)
-        });
+    // The dashboard update keeps feedingSchedules current
+    const schedules = feedingSchedules.map(schedule => Object.assign({}, schedule));
+    schedules[index].enabled = enabled;
+    fetch('/api/schedules', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(schedules)
     })
     .then(response => response.json())
     .then(data => {
@@ -459,24 +449,392 @@ function showAlert(message, type) {
 }
 </script>
 {% endblock %}'''
+
+
+def _int_arg(name: str, default: int, lo: int, hi: int) -> int:
+    """
+    Read an integer query argument, clamped to [lo, hi]
+    
+    Args:
+        name: Query argument name
+        default: Value used when the argument is missing or not an integer
+        lo: Smallest allowed value
+        hi: Largest allowed value
+    """
+    return max(lo, min(hi, request.args.get(name, default, type=int)))
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson"""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Types orjson doesn't know fall back to Flask's default handling
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
+class WebInterface:
+    def __init__(self, cat_feeder):
+        """Initialize web interface"""
+        self.cat_feeder = cat_feeder
+        self.app = Flask(__name__)
+        self.app.config['SECRET_KEY'] = 'cat-feeder-secret-key'
+        
+        # jsonify, request.get_json and cached bodies all go through app.json
+        if orjson is not None:
+            self.app.json = OrjsonProvider(self.app)
+        
+        # (endpoint, argument) -> (monotonic expiry, encoded JSON body, ETag)
+        self._response_cache: Dict[Tuple[str, Hashable], Tuple[float, bytes, str]] = {}
         
-        # Write templates to files
-        with open(os.path.join(templates_dir, 'base.html'), 'w') as f:
-            f.write(base_template)
+        # Taring and calibrating take seconds of HX711 samples, so they run
+        # on one sensor thread rather than holding a request worker
+        self._sensor_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sensor')
+        self._sensor_tasks: Dict[str, Future] = {}
+        self._sensor_tasks_lock = threading.Lock()
         
-        with open(os.path.join(templates_dir, 'index.html'), 'w') as f:
-            f.write(index_template)
+        self._status_streams = threading.BoundedSemaphore(MAX_STATUS_STREAMS)
+        
+        self._setup_routes()
+        self._setup_templates()
+        self.app.after_request(self._compress_response)
+    
+    def _setup_routes(self):
+        """Setup Flask routes"""
+        
+        @self.app.route('/')
+        def index():
+            """Main dashboard"""
+            status = self.cat_feeder.get_status()
+            recent_events = self.cat_feeder.database.get_recent_events(DASHBOARD_EVENTS)
+            return render_template('index.html', status=status, events=recent_events,
+                                   dashboard_events=DASHBOARD_EVENTS)
+        
+        @self.app.route('/api/status')
+        def api_status():
+            """Get system status as JSON"""
+            return Response(self.cat_feeder.get_status_json(), mimetype='application/json')
+        
+        @self.app.route('/api/stream')
+        def api_stream():
+            """Push the status as Server-Sent Events whenever it changes"""
+            if not self._status_streams.acquire(blocking=False):
+                return jsonify({'error': 'Too many status streams'}), 503
+            
+            updates = self.cat_feeder.subscribe_status()
+            
+            def close():
+                self.cat_feeder.unsubscribe_status(updates)
+                self._status_streams.release()
+            
+            def stream():
+                yield b'data: ' + self.cat_feeder.get_status_json() + b'\n\n'
+                while True:
+                    try:
+                        body = updates.get(timeout=STREAM_KEEPALIVE)
+                    except queue.Empty:
+                        # Comment lines keep proxies from timing the
+                        # connection out and reveal disconnected clients
+                        yield b': keepalive\n\n'
+                    else:
+                        yield b'data: ' + body + b'\n\n'
+            
+            response = Response(stream(), mimetype='text/event-stream')
+            response.headers['Cache-Control'] = 'no-cache'
+            response.call_on_close(close)
+            return response
+        
+        @self.app.route('/api/dashboard')
+        def api_dashboard():
+            """Get everything the dashboard refreshes, in one response"""
+            try:
+                # Splice the already-encoded status and events bodies together
+                _, events, _ = self._cached_body('events', DASHBOARD_EVENTS,
+                                                 lambda: self.cat_feeder.database.get_recent_events(DASHBOARD_EVENTS))
+                body = b''.join((b'{"status":', self.cat_feeder.get_status_json(),
+                                 b',"events":', events, b'}'))
+                return Response(body, mimetype='application/json')
+            except Exception as e:
+                logger.error(f"Error getting dashboard data: {e}")
+                return jsonify({'error': str(e)})
+        
+        @self.app.route('/api/feed', methods=['POST'])
+        def api_feed():
+            """Trigger manual feeding"""
+            try:
+                data = request.get_json()
+                portion = data.get('portion', 50)  # Default 50g
+                
+                success = self.cat_feeder.feed_cat(portion)
+                self._response_cache.clear()
+                return jsonify({'success': success})
+            except Exception as e:
+                logger.error(f"Error in manual feeding: {e}")
+                return jsonify({'success': False, 'error': str(e)})
+        
+        @self.app.route('/api/feed_manual', methods=['POST'])
+        def api_feed_manual():
+            """Manual feeding with duration"""
+            try:
+                data = request.get_json()
+                duration = data.get('duration', 2.0)  # Default 2 seconds
+                
+                success = self.cat_feeder.feeder_controller.dispense_food_manual(duration)
+                self._response_cache.clear()
+                return jsonify({'success': success})
+            except Exception as e:
+                logger.error(f"Error in manual feeding: {e}")
+                return jsonify({'success': False, 'error': str(e)})
+        
+        @self.app.route('/api/tare', methods=['POST'])
+        def api_tare():
+            """Start taring the weight sensor; poll /api/task/<task_id> for the result"""
+            try:
+                return self._submit_sensor_task(self.cat_feeder.weight_sensor.tare)
+            except Exception as e:
+                logger.error(f"Error taring scale: {e}")
+                return jsonify({'success': False, 'error': str(e)})
+        
+        @self.app.route('/api/calibrate', methods=['POST'])
+        def api_calibrate():
+            """Calibrate weight sensor"""
+            try:
+                data = request.get_json()
+                known_weight = data.get('known_weight')
+                
+                if not known_weight:
+                    return jsonify({'success': False, 'error': 'Known weight required'})
+                
+                return self._submit_sensor_task(self.cat_feeder.weight_sensor.calibrate, known_weight)
+            except Exception as e:
+                logger.error(f"Error calibrating: {e}")
+                return jsonify({'success': False, 'error': str(e)})
+        
+        @self.app.route('/api/task/<task_id>')
+        def api_task(task_id):
+            """Get the state of a tare or calibrate task"""
+            with self._sensor_tasks_lock:
+                future = self._sensor_tasks.get(task_id)
+            if future is None:
+                return jsonify({'success': False, 'error': 'Unknown task'}), 404
+            if not future.done():
+                return jsonify({'done': False})
+            error = future.exception()
+            if error is not None:
+                return jsonify({'done': True, 'success': False, 'error': str(error)})
+            return jsonify({'done': True, 'success': bool(future.result())})
+        
+        @self.app.route('/api/schedules', methods=['GET', 'POST'])
+        def api_schedules():
+            """Get or update feeding schedules"""
+            if request.method == 'GET':
+                return jsonify(self.cat_feeder.feeding_schedules)
+            else:
+                try:
+                    data = request.get_json()
+                    # update_config validates the schedules before applying them
+                    self.cat_feeder.update_config({'feeding_schedules': data})
+                    self._response_cache.clear()
+                    return jsonify({'success': True})
+                except Exception as e:
+                    logger.error(f"Error updating schedules: {e}")
+                    return jsonify({'success': False, 'error': str(e)})
+        
+        @self.app.route('/api/events')
+        def api_events():
+            """Get recent events"""
+            try:
+                limit = _int_arg('limit', 50, 1, MAX_EVENTS_LIMIT)
+                return self._cached_json('events', limit,
+                                         lambda: self.cat_feeder.database.get_recent_events(limit))
+            except Exception as e:
+                logger.error(f"Error getting events: {e}")
+                return jsonify({'error': str(e)})
+        
+        @self.app.route('/api/config', methods=['GET', 'POST'])
+        def api_config():
+            """Get or update configuration"""
+            if request.method == 'GET':
+                return jsonify(self.cat_feeder.config)
+            else:
+                try:
+                    data = request.get_json()
+                    self.cat_feeder.update_config(data)
+                    self._response_cache.clear()
+                    return jsonify({'success': True})
+                except Exception as e:
+                    logger.error(f"Error updating config: {e}")
+                    return jsonify({'success': False, 'error': str(e)})
+        
+        @self.app.route('/api/weight_history')
+        def api_weight_history():
+            """
+            Get weight history data, as JSON or with ?format=binary as packed arrays
+            
+            JSON readings are averaged over bucket_seconds (default 300);
+            bucket_seconds=0 returns every reading.
+            """
+            try:
+                hours = _int_arg('hours', 24, 1, MAX_HISTORY_HOURS)
+                if request.args.get('format') == 'binary':
+                    arrays = self.cat_feeder.database.get_weight_history_arrays(hours)
+                    if arrays is not None:
+                        return self._binary_weight_history(*arrays)
+                
+                database = self.cat_feeder.database
+                bucket_seconds = _int_arg('bucket_seconds', WEIGHT_BUCKET_SECONDS, 0, hours * 3600)
+                if bucket_seconds > 0:
+                    load = lambda: database.get_weight_history_buckets(hours, bucket_seconds)
+                else:
+                    load = lambda: database.get_weight_history(hours)
+                return self._cached_json('weight_history', (hours, bucket_seconds), load)
+            except Exception as e:
+                logger.error(f"Error getting weight history: {e}")
+                return jsonify({'error': str(e)})
+        
+        @self.app.route('/api/feeding_history')
+        def api_feeding_history():
+            """Get feeding history data"""
+            try:
+                days = _int_arg('days', 7, 1, MAX_HISTORY_DAYS)
+                return self._cached_json('feeding_history', days,
+                                         lambda: self.cat_feeder.database.get_feeding_history(days))
+            except Exception as e:
+                logger.error(f"Error getting feeding history: {e}")
+                return jsonify({'error': str(e)})
+    
+    def _submit_sensor_task(self, fn: Callable[..., bool], *args: Any):
+        """
+        Run a weight sensor operation on the sensor thread
+        
+        Args:
+            fn: Sensor method returning True on success
+            *args: Arguments for fn
+            
+        Returns:
+            202 response carrying the task_id to poll; the outcome is only
+            known once /api/task/<task_id> reports done
+        """
+        task_id = uuid.uuid4().hex
+        with self._sensor_tasks_lock:
+            if len(self._sensor_tasks) >= SENSOR_TASKS_MAX:
+                for done_id in [t for t, f in self._sensor_tasks.items() if f.done()]:
+                    del self._sensor_tasks[done_id]
+            self._sensor_tasks[task_id] = self._sensor_executor.submit(fn, *args)
+        return jsonify({'task_id': task_id, 'done': False}), 202
+    
+    def _binary_weight_history(self, timestamps, weights) -> Response:
+        """
+        Pack weight history for typed-array clients
+        
+        The body holds every reading's local time as a little-endian float64
+        of milliseconds since the epoch, followed by every weight in kg as a
+        little-endian float32, readable with Float64Array(buffer, 0, n) and
+        Float32Array(buffer, 8 * n, n). X-Sample-Count gives n.
+        
+        Args:
+            timestamps: datetime64[ms] array from get_weight_history_arrays
+            weights: float32 array from get_weight_history_arrays
+        """
+        body = timestamps.astype('<i8').astype('<f8').tobytes() + weights.astype('<f4').tobytes()
+        response = Response(body, mimetype='application/octet-stream')
+        response.headers['X-Sample-Count'] = str(len(weights))
+        return response
+    
+    def _cached_json(self, endpoint: str, arg: Hashable, load: Callable[[], Any]) -> Response:
+        """
+        Serve load()'s result as JSON, reusing the encoded body while it is fresh
+        
+        The response carries an ETag of the body, so a client polling
+        unchanged data gets an empty 304 Not Modified.
+        
+        Args:
+            endpoint: Key into _RESPONSE_TTL
+            arg: The endpoint's query arguments, part of the cache key
+            load: Fetches the data when there is no fresh body
+        """
+        _, body, etag = self._cached_body(endpoint, arg, load)
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response.make_conditional(request)
+    
+    def _cached_body(self, endpoint: str, arg: Hashable,
+                     load: Callable[[], Any]) -> Tuple[float, bytes, str]:
+        """Get the cached (expiry, JSON body, ETag) for a request, refreshing it if stale"""
+        key = (endpoint, arg)
+        now = time.monotonic()
+        cached = self._response_cache.get(key)
+        if cached is None or now >= cached[0]:
+            if len(self._response_cache) >= _RESPONSE_CACHE_MAX:
+                self._response_cache.clear()
+            body = self.app.json.dumps(load()).encode()
+            etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+            cached = (now + _RESPONSE_TTL[endpoint], body, etag)
+            self._response_cache[key] = cached
+        return cached
+    
+    def _compress_response(self, response: Response) -> Response:
+        """
+        Gzip a JSON response when the client accepts it
+        
+        Binary weight history, 304s and small bodies are sent as they are.
+        The ETag is weakened since the compressed bytes differ from the ones
+        it was computed over.
+        
+        Args:
+            response: The response returned by the view
+        """
+        if (response.mimetype != 'application/json'
+                or response.status_code != 200
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or 'gzip' not in request.accept_encodings):
+            return response
+        
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_SIZE:
+            return response
+        
+        response.set_data(gzip.compress(body, compresslevel=COMPRESS_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+    
+    def _setup_templates(self):
+        """Setup HTML templates"""
+        # Serve the templates from memory; they never change at runtime
+        self.app.jinja_loader = DictLoader({
+            'base.html': _BASE_TEMPLATE,
+            'index.html': _INDEX_TEMPLATE
+        })
+        self.app.config['TEMPLATES_AUTO_RELOAD'] = False
+        self.app.jinja_env.auto_reload = False
+        
+        # Compile now so the first dashboard request doesn't pay for it
+        self.app.jinja_env.get_template('index.html')
     
     def start(self, host='0.0.0.0', port=5000):
         """Start the web server"""
         try:
             logger.info(f"Starting web interface on {host}:{port}")
-            self.app.run(host=host, port=port, debug=False, threaded=True)
+            if waitress is not None:
+                waitress.serve(self.app, host=host, port=port, threads=WEB_THREADS)
+            else:
+                self.app.run(host=host, port=port, debug=False, threaded=True)
         except Exception as e:
             logger.error(f"Failed to start web interface: {e}")
     
     def stop(self):
         """Stop the web server"""
         logger.info("Stopping web interface")
+        self._sensor_executor.shutdown(wait=False)
         # Flask doesn't have a built-in stop method, but the server will stop
         # when the main thread exits 
\ No newline at end of file
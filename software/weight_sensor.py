@@ -7,20 +7,14 @@ Handles HX711 load cell amplifier for weight measurements
 import time
 import logging
 import threading
+from collections import deque
 from typing import Optional, Tuple
 
-try:
-    import RPi.GPIO as GPIO
-    from hx711 import HX711
-except ImportError:
-    # Mock for development/testing
-    GPIO = None
-    HX711 = None
-
 logger = logging.getLogger(__name__)
 
 class WeightSensor:
-    def __init__(self, dout_pin: int, sck_pin: int, calibration_factor: float = 2280.0):
+    def __init__(self, dout_pin: int, sck_pin: int, calibration_factor: float = 2280.0,
+                 reading_samples: int = 3, tare_samples: int = 10):
         """
         Initialize weight sensor
         
@@ -28,27 +22,44 @@ class WeightSensor:
             dout_pin: GPIO pin for HX711 data output
             sck_pin: GPIO pin for HX711 serial clock
             calibration_factor: Calibration factor for weight conversion
+            reading_samples: HX711 samples averaged per weight reading
+            tare_samples: HX711 samples averaged when taring
         """
         self.dout_pin = dout_pin
         self.sck_pin = sck_pin
         self.calibration_factor = calibration_factor
+        self.reading_samples = reading_samples
+        self.tare_samples = tare_samples
         self.hx711 = None
+        self._gpio = None
+        # hx711.get_weight, bound once for the sampling hot path
+        self._read_weight = None
         self.tare_value = 0
         self.is_calibrated = False
-        self.lock = threading.Lock()
         
-        # Weight smoothing
-        self.weight_history = []
+        # Guards the HX711 itself; reentrant because calibrate() tares while
+        # holding it
+        self.lock = threading.RLock()
+        
+        # Weight smoothing; the deque drops the oldest reading itself
         self.max_history_size = 10
+        self.weight_history = deque(maxlen=self.max_history_size)
         
         self._initialize_sensor()
     
     def _initialize_sensor(self):
         """Initialize the HX711 sensor"""
+        # The drivers are only imported here, so development machines
+        # running the mock sensor never load them
+        try:
+            import RPi.GPIO as GPIO
+            from hx711 import HX711
+        except ImportError:
+            logger.warning("GPIO/HX711 not available - using mock sensor")
+            return
+        
         try:
-            if GPIO is None or HX711 is None:
-                logger.warning("GPIO/HX711 not available - using mock sensor")
-                return
+            self._gpio = GPIO
             
             # Setup GPIO
             GPIO.setmode(GPIO.BCM)
@@ -59,6 +70,7 @@ class WeightSensor:
             self.hx711 = HX711(self.dout_pin, self.sck_pin)
             self.hx711.set_reading_format("MSB", "MSB")
             self.hx711.set_reference_unit(self.calibration_factor)
+            self._read_weight = self.hx711.get_weight
             
             # Reset and tare
             self.hx711.reset()
@@ -69,14 +81,17 @@ class WeightSensor:
         except Exception as e:
             logger.error(f"Failed to initialize weight sensor: {e}")
             self.hx711 = None
+            self._read_weight = None
     
-    def tare(self, samples: int = 10):
+    def tare(self, samples: Optional[int] = None):
         """
         Tare the scale (set zero point)
         
         Args:
-            samples: Number of samples to average for tare
+            samples: Number of samples to average for tare, tare_samples if None
         """
+        if samples is None:
+            samples = self.tare_samples
         try:
             if self.hx711 is None:
                 logger.warning("Cannot tare - sensor not initialized")
@@ -93,35 +108,41 @@ class WeightSensor:
             logger.error(f"Failed to tare scale: {e}")
             return False
     
-    def get_weight(self, samples: int = 3) -> Optional[float]:
+    def get_weight(self, samples: Optional[int] = None) -> Optional[float]:
         """
         Get current weight reading
         
+        Each sample is a full bit-banged HX711 conversion, so the sample
+        count is most of the cost of a reading.
+        
         Args:
-            samples: Number of samples to average
+            samples: Number of samples to average, reading_samples if None
             
         Returns:
             Weight in kilograms, or None if error
         """
         try:
-            if self.hx711 is None:
+            read_weight = self._read_weight
+            if read_weight is None:
                 # Return mock weight for testing
                 return self._get_mock_weight()
             
+            # Only the HX711 transaction needs the lock; readings come from
+            # the one scheduler thread, which owns the smoothing window
             with self.lock:
                 # Get raw reading
-                raw_value = self.hx711.get_weight(samples)
-                
-                if raw_value is None:
-                    return None
-                
-                # Convert to kilograms
-                weight_kg = raw_value / 1000.0  # Convert grams to kg
-                
-                # Apply smoothing
-                weight_kg = self._smooth_weight(weight_kg)
-                
-                return weight_kg
+                raw_value = read_weight(samples or self.reading_samples)
+            
+            if raw_value is None:
+                return None
+            
+            # Convert to kilograms
+            weight_kg = raw_value / 1000.0  # Convert grams to kg
+            
+            # Apply smoothing
+            weight_kg = self._smooth_weight(weight_kg)
+            
+            return weight_kg
                 
         except Exception as e:
             logger.error(f"Error reading weight: {e}")
@@ -129,17 +150,11 @@ class WeightSensor:
     
     def _smooth_weight(self, weight: float) -> float:
         """Apply smoothing to weight readings"""
-        self.weight_history.append(weight)
-        
-        # Keep only recent readings
-        if len(self.weight_history) > self.max_history_size:
-            self.weight_history.pop(0)
+        history = self.weight_history
+        history.append(weight)
         
         # Return average of recent readings
-        if len(self.weight_history) > 0:
-            return sum(self.weight_history) / len(self.weight_history)
-        
-        return weight
+        return sum(history) / len(history)
     
     def _get_mock_weight(self) -> float:
         """Get mock weight for testing (when GPIO not available)"""
@@ -208,11 +223,12 @@ class WeightSensor:
             calibration_factor: Calibration factor
             tare_value: Tare value
         """
-        self.calibration_factor = calibration_factor
-        self.tare_value = tare_value
-        
-        if self.hx711 is not None:
-            self.hx711.set_reference_unit(calibration_factor)
+        with self.lock:
+            self.calibration_factor = calibration_factor
+            self.tare_value = tare_value
+            
+            if self.hx711 is not None:
+                self.hx711.set_reference_unit(calibration_factor)
     
     def is_stable(self, threshold: float = 0.05) -> bool:
         """
@@ -224,13 +240,20 @@ class WeightSensor:
         Returns:
             True if weight is stable
         """
-        if len(self.weight_history) < 3:
+        history = self.weight_history
+        if len(history) < 3:
             return False
         
-        recent_weights = self.weight_history[-3:]
-        max_diff = max(recent_weights) - min(recent_weights)
+        # The spread of the last three readings is within threshold when the
+        # third lies no further than threshold from both ends of the first
+        # two; an unstable first pair skips the third reading entirely
+        low, high = history[-1], history[-2]
+        if low > high:
+            low, high = high, low
+        if high - low > threshold:
+            return False
         
-        return max_diff <= threshold
+        return high - threshold <= history[-3] <= low + threshold
     
     def cleanup(self):
         """Clean up GPIO resources"""
@@ -239,8 +262,8 @@ class WeightSensor:
                 self.hx711.power_down()
                 self.hx711.power_up()
             
-            if GPIO is not None:
-                GPIO.cleanup([self.dout_pin, self.sck_pin])
+            if self._gpio is not None:
+                self._gpio.cleanup([self.dout_pin, self.sck_pin])
                 
             logger.info("Weight sensor cleaned up")
             